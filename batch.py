@@ -0,0 +1,251 @@
+# batch.py
+"""
+Solves many Fifteen Puzzles at once on a pool of worker processes.
+
+    for result in solveBatch(puzzles, 'astar', 'manhattan', workers=8, timeout=10):
+        print(result['index'], result['status'], len(result['path']))
+
+or from the command line, one puzzle of 16 numbers per line:
+
+    python batch.py puzzles.txt --workers 8 --timeout 10 > results.jsonl
+"""
+
+import concurrent.futures
+import concurrent.futures.process
+import json
+import math
+import os
+import sys
+import time
+
+import fifteenpuzzle
+import heuristics
+import search
+import util
+
+# Search functions that take a heuristic argument; the bidirectional A* searches
+# back to the start with heuristics.manhattanTo
+INFORMED_ALGORITHMS = ('astar', 'aStarSearch', 'arastar', 'anytimeAStarSearch', 'idastar', 'idaStarSearch',
+                       'biastar', 'bidirectionalAStarSearch')
+
+# Search functions that always return optimal paths (given an admissible heuristic)
+OPTIMAL_ALGORITHMS = ('bfs', 'breadthFirstSearch', 'ucs', 'uniformCostSearch',
+                      'astar', 'aStarSearch', 'idastar', 'idaStarSearch',
+                      'bibfs', 'bidirectionalBreadthFirstSearch', 'biastar', 'bidirectionalAStarSearch')
+
+# Every search function a batch can run
+ALGORITHMS = INFORMED_ALGORITHMS + ('bfs', 'breadthFirstSearch', 'dfs', 'depthFirstSearch',
+                                    'ucs', 'uniformCostSearch', 'bibfs', 'bidirectionalBreadthFirstSearch')
+
+# Heuristics by name: those of heuristics.py, and the pattern database
+HEURISTICS = ('h1', 'h2', 'h3', 'h4', 'manhattan', 'linearConflict', 'walkingDistance', 'patterndb')
+
+# Seconds an anytime search may overrun its time limit before it is interrupted
+ANYTIME_TIMEOUT_MARGIN = 5
+
+# Each worker process loads the pattern databases and opens the solution cache at most once
+_patternDatabase = None
+_solutionCache = None
+
+def _getHeuristic(name):
+    """
+    Resolves a heuristic by name: any heuristic in heuristics.py, or
+    'patterndb' for the default pattern database (see patterndb.py).
+    """
+    global _patternDatabase
+    if name == 'patterndb':
+        if _patternDatabase is None:
+            import patterndb
+            _patternDatabase = patterndb.PatternDatabaseHeuristic()
+        return _patternDatabase
+    return getattr(heuristics, name)
+
+def checkOptions(algorithm, heuristic, timeout):
+    """
+    Raises ValueError unless algorithm is one of ALGORITHMS, heuristic one
+    of HEURISTICS (if the algorithm uses one) and timeout None or a
+    positive number of seconds.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError('Unknown algorithm: %s' % (algorithm,))
+    if algorithm in INFORMED_ALGORITHMS and heuristic not in HEURISTICS:
+        raise ValueError('Unknown heuristic: %s' % (heuristic,))
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+                                or not timeout > 0):
+        raise ValueError('Not a timeout: %s' % (timeout,))
+
+def _getCache(path):
+    global _solutionCache
+    if _solutionCache is None:
+        import cache
+        _solutionCache = cache.SolutionCache(path=path)
+    return _solutionCache
+
+def solvePuzzle(index, numbers, algorithm='astar', heuristic='manhattan', timeout=None, cachePath=None):
+    """
+    Solves one puzzle and returns a result dict with the puzzle's 'index'
+    and 'puzzle' numbers, its 'status' ('solved', 'failed', 'timeout' or
+    'unsolvable'), the 'path' of moves found, the wall-clock 'seconds'
+    taken and the search's 'stats' (search.SearchStats.asDict(), also filled
+    in up to the point where a search timed out).
+
+    algorithm and heuristic are names, so that they can be sent to worker
+    processes, and must be among ALGORITHMS and HEURISTICS (see
+    checkOptions). timeout is in seconds and rounded up to a whole second.
+    Anytime searches ('arastar') are given timeout as their time limit
+    instead, and return the best path found by then, with its bound in
+    stats['suboptimalityBound']; they are only interrupted if they have
+    no path ANYTIME_TIMEOUT_MARGIN seconds later.
+
+    cachePath: sqlite file of a cache.SolutionCache shared by the workers.
+    Solutions found there are returned without searching, with 'cached'
+    set in the result; new solutions of optimal searches are added to it.
+    """
+    checkOptions(algorithm, heuristic, timeout)
+    problem = fifteenpuzzle.FifteenPuzzleSearchProblem(fifteenpuzzle.FifteenPuzzleState(numbers))
+    searchFunction = getattr(search, algorithm)
+    stats = search.SearchStats()
+    alarm = int(math.ceil(timeout)) if timeout else None
+    if searchFunction is search.anytimeAStarSearch:
+        h = _getHeuristic(heuristic)
+        run = lambda: searchFunction(problem, h, timeLimit=timeout, stats=stats)
+        if alarm:
+            alarm += ANYTIME_TIMEOUT_MARGIN
+    elif searchFunction is search.bidirectionalAStarSearch:
+        h = _getHeuristic(heuristic)
+        backward = heuristics.manhattanTo(problem.getStartState())
+        run = lambda: searchFunction(problem, h, backward, stats=stats)
+    elif algorithm in INFORMED_ALGORITHMS:
+        h = _getHeuristic(heuristic)
+        run = lambda: searchFunction(problem, h, stats=stats)
+    else:
+        run = lambda: searchFunction(problem, stats=stats)
+    if alarm:
+        run = util.TimeoutFunction(run, alarm)
+    solutionCache = _getCache(cachePath) if cachePath else None
+
+    start = time.time()
+    status = 'solved'
+    path = []
+    cached = False
+    try:
+        if solutionCache is not None:
+            cachedPath = solutionCache.get(problem.getStartState())
+            cached = cachedPath is not None
+        if cached:
+            path = cachedPath
+        else:
+            path = run()
+        if isinstance(path, tuple):  # depthFirstSearch also returns a node count
+            path = path[0]
+        path = path or []
+        if not path and not problem.isGoalState(problem.getStartState()):
+            status = 'failed'
+        elif path and not cached and solutionCache is not None and algorithm in OPTIMAL_ALGORITHMS:
+            solutionCache.put(problem.getStartState(), path)
+    except util.TimeoutFunctionException:
+        status = 'timeout'
+    except search.UnsolvableProblemException:
+        status = 'unsolvable'
+    return {
+        'index': index,
+        'puzzle': list(numbers),
+        'status': status,
+        'path': path,
+        'seconds': time.time() - start,
+        'stats': stats.asDict(),
+        'cached': cached,
+    }
+
+def errorResult(index, numbers, exception):
+    "The result of a puzzle whose solver raised exception, with status 'error'."
+    return {'index': index, 'puzzle': list(numbers), 'status': 'error', 'error': repr(exception)}
+
+def solveBatch(puzzles, algorithm='astar', heuristic='manhattan', workers=None, timeout=None,
+               cachePath=None):
+    """
+    Solves every puzzle of the iterable puzzles (lists of 16 numbers or
+    puzzle states) on a ProcessPoolExecutor of workers processes (default:
+    one per CPU), and yields the result dicts of solvePuzzle in the order
+    they complete.
+
+    Puzzles are read lazily and at most a few per worker are queued at any
+    time, so puzzles can be a generator over a very large input.
+
+    A puzzle whose solver raises, say a MemoryError, gets an errorResult
+    instead of stopping the batch. When a worker dies (killed for using too
+    much memory, for instance), the puzzles in flight get error results and
+    the rest are solved on a new pool.
+    """
+    checkOptions(algorithm, heuristic, timeout)
+    workers = workers or os.cpu_count() or 1
+    limit = workers * 4
+    puzzles = iter(puzzles)
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {}
+        index = 0
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < limit:
+                try:
+                    puzzle = next(puzzles)
+                except StopIteration:
+                    exhausted = True
+                    break
+                numbers = list(getattr(puzzle, 'tiles', puzzle))
+                args = (solvePuzzle, index, numbers, algorithm, heuristic, timeout, cachePath)
+                try:
+                    future = pool.submit(*args)
+                except concurrent.futures.process.BrokenProcessPool:
+                    pool.shutdown(wait=False)
+                    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+                    future = pool.submit(*args)
+                pending[future] = (index, numbers)
+                index += 1
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                futureIndex, numbers = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exception:
+                    result = errorResult(futureIndex, numbers, exception)
+                yield result
+    finally:
+        pool.shutdown()
+
+def readPuzzles(lines):
+    """
+    Parses puzzles of 16 numbers, separated by spaces or commas, one per
+    line. Blank lines and lines starting with '#' are skipped.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        numbers = [int(number) for number in line.replace(',', ' ').split()]
+        if sorted(numbers) != list(range(16)):
+            raise ValueError('Not a fifteen puzzle: %s' % line)
+        yield numbers
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Solve fifteen puzzles in parallel; results are written as JSON lines.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='file with one puzzle of 16 numbers per line (default: stdin)')
+    parser.add_argument('--algorithm', default='astar', help='search function (default: %(default)s)')
+    parser.add_argument('--heuristic', default='manhattan', help='heuristic name (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPUs)')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds allowed per puzzle')
+    parser.add_argument('--cache', default=None, help='sqlite file to look up and store solutions in')
+    options = parser.parse_args()
+
+    source = sys.stdin if options.input == '-' else open(options.input)
+    with source:
+        for result in solveBatch(readPuzzles(source), options.algorithm, options.heuristic,
+                                 options.workers, options.timeout, options.cache):
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
@@ -0,0 +1,247 @@
+# benchmark.py
+"""
+Benchmarks the search algorithms and heuristics on fixed sets of puzzles.
+
+    python benchmark.py --save results.json
+    python benchmark.py --baseline results.json
+
+Every case (an algorithm, with a heuristic for the informed searches) is run
+on every puzzle of the selected instance sets. For each run the search
+statistics (nodes expanded and generated, largest frontier, heuristic calls,
+see search.SearchStats), nodes per second, peak memory allocated and wall
+time are recorded. Results are written as JSON; when a baseline file from an earlier
+run is given, the totals of each case and set are compared against it and
+the exit status is 1 if any of them got worse by more than the tolerance.
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import fifteenpuzzle
+import generator
+import heuristics
+import search
+import util
+
+GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+
+def randomWalkInstances(moves, count, rng):
+    "count puzzles made by moves random moves, never undoing the previous move."
+    instances = []
+    for _ in range(count):
+        state = fifteenpuzzle.FifteenPuzzleState(GOAL)
+        last = None
+        for _ in range(moves):
+            choices = [move for move in state.legalMoves()
+                       if move != fifteenpuzzle.OPPOSITE_MOVES.get(last)]
+            last = rng.choice(choices)
+            state = state.result(last)
+        instances.append(list(state.tiles))
+    return instances
+
+def randomPermutationInstances(count, rng):
+    """
+    count uniformly random solvable puzzles, the way Korf's 100 instances
+    were drawn (see generator.randomSolvableNumbers).
+    """
+    return [generator.randomSolvableNumbers(rng) for _ in range(count)]
+
+def instanceSets():
+    """
+    Returns a dict from set name to list of puzzles. The sets are
+    reproducible: they are drawn from util.FixedRandom.
+    """
+    rng = util.FixedRandom().random
+    sets = {'builtin': [numbers for numbers in fifteenpuzzle.FIFTEEN_PUZZLE_DATA
+                        if fifteenpuzzle.isSolvableBoard(numbers)]}
+    for moves in (10, 30, 50, 80):
+        sets['walk-%d' % moves] = randomWalkInstances(moves, 10, rng)
+    sets['korf100'] = randomPermutationInstances(100, rng)
+    return sets
+
+DEFAULT_SETS = ['walk-10', 'walk-30', 'walk-50']
+# Plain BFS runs out of time (and takes gigabytes) beyond walk-10, so it is not a default case
+DEFAULT_CASES = ['astar:manhattan', 'astar:linearConflict', 'astar:walkingDistance',
+                 'idastar:manhattan', 'idastar:linearConflict', 'idastar:walkingDistance']
+
+def runCase(case, numbers, timeout, measureMemory, timeHeuristic=False):
+    """
+    Runs one case ('algorithm' or 'algorithm:heuristic') on one puzzle and
+    returns a dict of measurements. Peak memory is measured in a second,
+    traced run, so that tracing does not distort the timings; runs that
+    time out get the peak reached before the timeout. Heuristic
+    calls are only counted and timed with timeHeuristic, which slows the
+    timed run down (see search.SearchStats).
+    """
+    algorithm, _, heuristicName = case.partition(':')
+    searchFunction = getattr(search, algorithm)
+    heuristic = getattr(heuristics, heuristicName) if heuristicName else None
+    if heuristic is not None:
+        # build any lazily computed tables outside the timed run
+        heuristic(fifteenpuzzle.FifteenPuzzleState(GOAL))
+
+    def run(stats):
+        problem = fifteenpuzzle.FifteenPuzzleSearchProblem(fifteenpuzzle.FifteenPuzzleState(numbers))
+        if heuristic is not None:
+            path = searchFunction(problem, heuristic, stats=stats)
+        else:
+            path = searchFunction(problem, stats=stats)
+        if isinstance(path, tuple):
+            path = path[0]
+        return path
+
+    status = 'solved'
+    path = []
+    stats = search.SearchStats(timeHeuristic=timeHeuristic)
+    start = time.perf_counter()
+    try:
+        path = util.TimeoutFunction(lambda: run(stats), timeout)()
+    except util.TimeoutFunctionException:
+        status = 'timeout'
+    seconds = time.perf_counter() - start
+    solved = status == 'solved'
+
+    peakMemory = None
+    if measureMemory:
+        tracemalloc.start()
+        try:
+            util.TimeoutFunction(lambda: run(search.SearchStats()), timeout)()
+        except util.TimeoutFunctionException:
+            pass
+        finally:
+            peakMemory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    return {
+        'status': status,
+        'length': len(path) if solved else None,
+        'expanded': stats.expanded if solved else None,
+        'generated': stats.generated if solved else None,
+        'duplicates': stats.duplicates if solved else None,
+        'maxFrontier': stats.maxFrontier if solved else None,
+        'heuristicCalls': stats.heuristicCalls if solved and timeHeuristic else None,
+        'heuristicTime': stats.heuristicTime if solved and timeHeuristic else None,
+        'seconds': seconds,
+        'nodesPerSecond': stats.expanded / seconds if solved and seconds > 0 else None,
+        'peakMemory': peakMemory,
+    }
+
+def runBenchmark(cases=DEFAULT_CASES, setNames=DEFAULT_SETS, timeout=30, measureMemory=True,
+                 verbose=False, timeHeuristic=False):
+    """
+    Runs every case on every puzzle of the named sets and returns the
+    results: a dict with 'meta' information, one entry per run in 'runs'
+    and per case and set totals in 'summary'.
+    """
+    sets = instanceSets()
+    runs = []
+    summary = {}
+    for setName in setNames:
+        for case in cases:
+            # totals are over the solved runs only, but for the peak memory of the timeouts
+            total = {'solved': 0, 'timeouts': 0, 'expanded': 0, 'generated': 0, 'maxFrontier': 0,
+                     'seconds': 0.0, 'peakMemory': 0, 'timeoutPeakMemory': 0}
+            for index, numbers in enumerate(sets[setName]):
+                result = runCase(case, numbers, timeout, measureMemory, timeHeuristic)
+                result.update({'set': setName, 'index': index, 'case': case})
+                runs.append(result)
+                if result['status'] == 'solved':
+                    total['solved'] += 1
+                    total['expanded'] += result['expanded']
+                    total['generated'] += result['generated']
+                    total['maxFrontier'] = max(total['maxFrontier'], result['maxFrontier'])
+                    total['seconds'] += result['seconds']
+                    total['peakMemory'] = max(total['peakMemory'], result['peakMemory'] or 0)
+                else:
+                    total['timeouts'] += 1
+                    total['timeoutPeakMemory'] = max(total['timeoutPeakMemory'], result['peakMemory'] or 0)
+                if verbose:
+                    print('%-10s %-26s #%-3d %-8s %10s nodes %9.3fs' % (
+                        setName, case, index, result['status'], result['expanded'],
+                        result['seconds']), file=sys.stderr)
+            total['nodesPerSecond'] = total['expanded'] / total['seconds'] if total['seconds'] else None
+            summary['%s/%s' % (setName, case)] = total
+    meta = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'timeout': timeout,
+        'measureMemory': measureMemory,
+        'timeHeuristic': timeHeuristic,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    return {'meta': meta, 'runs': runs, 'summary': summary}
+
+def compareToBaseline(results, baseline, tolerance=0.2):
+    """
+    Returns a list of human readable regressions of results against
+    baseline, per case and set: fewer puzzles solved, or more nodes
+    expanded, time or peak memory than the baseline by more than the
+    relative tolerance. Nodes, time and memory are compared over the
+    puzzles solved in both runs.
+    """
+    solved = {}
+    for run in baseline['runs']:
+        if run['status'] == 'solved':
+            solved[run['set'], run['case'], run['index']] = run
+
+    totals = {}
+    for run in results['runs']:
+        old = solved.get((run['set'], run['case'], run['index']))
+        key = '%s/%s' % (run['set'], run['case'])
+        if old is None or run['status'] != 'solved':
+            continue
+        total = totals.setdefault(key, {'expanded': [0, 0], 'seconds': [0, 0], 'peakMemory': [0, 0]})
+        for field in total:
+            total[field][0] += run[field] or 0
+            total[field][1] += old[field] or 0
+
+    regressions = []
+    for key, total in sorted(results['summary'].items()):
+        if key not in baseline['summary']:
+            continue
+        old = baseline['summary'][key]
+        if total['solved'] < old['solved']:
+            regressions.append('%s: solved %d, baseline %d' % (key, total['solved'], old['solved']))
+        for field, (new, old) in sorted(totals.get(key, {}).items()):
+            if old and new > old * (1 + tolerance):
+                regressions.append('%s: %s %s, baseline %s (+%.0f%%)' % (
+                    key, field, new, old, 100.0 * (new / old - 1)))
+    return regressions
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the fifteen puzzle solvers.')
+    parser.add_argument('--sets', nargs='+', default=DEFAULT_SETS,
+                        help='instance sets to run (default: %(default)s); available: ' +
+                             ', '.join(sorted(instanceSets())))
+    parser.add_argument('--cases', nargs='+', default=DEFAULT_CASES,
+                        help="'algorithm' or 'algorithm:heuristic' pairs (default: %(default)s)")
+    parser.add_argument('--timeout', type=int, default=30, help='seconds allowed per run')
+    parser.add_argument('--no-memory', dest='measureMemory', action='store_false',
+                        help='do not trace allocations (faster, no peak memory)')
+    parser.add_argument('--time-heuristic', dest='timeHeuristic', action='store_true',
+                        help='count and time heuristic calls (slows down the timed runs)')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results against this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slack allowed against the baseline (default: %(default)s)')
+    options = parser.parse_args()
+
+    results = runBenchmark(options.cases, options.sets, options.timeout, options.measureMemory,
+                           verbose=True, timeHeuristic=options.timeHeuristic)
+    for key, total in sorted(results['summary'].items()):
+        print('%-40s solved %3d  timeouts %3d  expanded %10d  %9.3fs  %10.0f nodes/s  peak %s' % (
+            key, total['solved'], total['timeouts'], total['expanded'], total['seconds'],
+            total['nodesPerSecond'] or 0, total['peakMemory'] or '-'))
+    if options.save:
+        with open(options.save, 'w') as out:
+            json.dump(results, out, indent=1, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compareToBaseline(results, json.load(f), options.tolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,152 @@
+# cache.py
+"""
+A cache of optimal Fifteen Puzzle solutions, keyed by the packed board
+(see fifteenpuzzle.packCells).
+
+A board and its reflection across the main diagonal (see
+fifteenpuzzle.reflectTiles) share one entry, stored under the smaller of
+the two packed boards; the moves are reflected on the way in and out.
+
+    cache = SolutionCache(path='solutions.db')
+    actions = cache.solve(problem, search.aStarSearch, heuristics.linearConflict)
+
+Recently used solutions are kept in memory, up to capacity boards, least
+recently used first out. If a path is given, every solution is also
+written to an sqlite database there, so it survives the process and can be
+shared by several processes on one machine.
+
+Every suffix of an optimal path is an optimal path from the board where it
+starts, so storing a solution also stores the solutions of all the boards
+along it. Only store paths found by optimal searches (A* or IDA* with an
+admissible heuristic, breadth-first and uniform cost search).
+"""
+
+import collections
+import sqlite3
+
+import fifteenpuzzle
+
+# Moves are stored as one letter each
+MOVE_LETTERS = {'up': 'u', 'down': 'd', 'left': 'l', 'right': 'r'}
+LETTER_MOVES = dict((letter, move) for move, letter in MOVE_LETTERS.items())
+# Letters of fifteenpuzzle.REFLECTED_MOVES
+REFLECTED_LETTERS = str.maketrans('udlr', 'lrud')
+
+def canonicalKey(state):
+    """
+    Returns (board, reflected): the smaller of the packed boards of state
+    and of its reflection, and whether it is the reflection's.
+    """
+    tiles = list(state.tiles)
+    board = fifteenpuzzle.PackedFifteenPuzzleState(tiles).board
+    reflectedBoard = fifteenpuzzle.PackedFifteenPuzzleState(fifteenpuzzle.reflectTiles(tiles)).board
+    if reflectedBoard < board:
+        return reflectedBoard, True
+    return board, False
+
+def encodePath(actions):
+    return ''.join(MOVE_LETTERS[action] for action in actions)
+
+def decodePath(text):
+    return [LETTER_MOVES[letter] for letter in text]
+
+def _sqliteKey(board):
+    "sqlite integers are signed 64-bit: boards with a high top nibble wrap around."
+    return board - (1 << 64) if board >= 1 << 63 else board
+
+class SolutionCache:
+    """
+    Maps boards to optimal solutions, with an LRU in memory and an
+    optional sqlite store on disk. hits, diskHits (the hits that were only
+    found on disk), misses and stores count the lookups and writes.
+    """
+
+    def __init__(self, capacity=100000, path=None):
+        self.capacity = capacity
+        self.memory = collections.OrderedDict()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.stores = 0
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path, timeout=30)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS solutions (board INTEGER PRIMARY KEY, path TEXT NOT NULL)')
+            self.connection.commit()
+
+    def _remember(self, board, text):
+        self.memory[board] = text
+        self.memory.move_to_end(board)
+        if len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def get(self, state):
+        "Returns the stored solution of state as a list of moves, or None."
+        board, reflected = canonicalKey(state)
+        text = self.memory.get(board)
+        if text is not None:
+            self.memory.move_to_end(board)
+        elif self.connection is not None:
+            row = self.connection.execute('SELECT path FROM solutions WHERE board = ?',
+                                          (_sqliteKey(board),)).fetchone()
+            if row is not None:
+                text = row[0]
+                self.diskHits += 1
+                self._remember(board, text)
+        if text is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if reflected:
+            text = text.translate(REFLECTED_LETTERS)
+        return decodePath(text)
+
+    def put(self, state, actions, subpaths=True):
+        """
+        Stores actions as the optimal solution of state and, if subpaths is
+        set, the rest of actions as the solution of every board along it.
+        """
+        text = encodePath(actions)
+        state = fifteenpuzzle.PackedFifteenPuzzleState(list(state.tiles))
+        entries = []
+        for index, action in enumerate(actions):
+            board, reflected = canonicalKey(state)
+            suffix = text[index:]
+            entries.append((board, suffix.translate(REFLECTED_LETTERS) if reflected else suffix))
+            if not subpaths:
+                break
+            state = state.result(action)
+        for board, suffix in entries:
+            self._remember(board, suffix)
+        if self.connection is not None:
+            self.connection.executemany('INSERT OR IGNORE INTO solutions (board, path) VALUES (?, ?)',
+                                        [(_sqliteKey(board), suffix) for board, suffix in entries])
+            self.connection.commit()
+        self.stores += len(entries)
+
+    def solve(self, problem, searchFunction, *args, **kwargs):
+        """
+        Returns the cached solution of problem's start state, or runs
+        searchFunction(problem, *args, **kwargs) and caches what it finds.
+        """
+        startState = problem.getStartState()
+        actions = self.get(startState)
+        if actions is not None:
+            return actions
+        actions = searchFunction(problem, *args, **kwargs)
+        if actions:
+            self.put(startState, actions)
+        return actions
+
+    def counters(self):
+        return {'hits': self.hits, 'diskHits': self.diskHits, 'misses': self.misses,
+                'stores': self.stores, 'size': len(self.memory)}
+
+    def __len__(self):
+        return len(self.memory)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
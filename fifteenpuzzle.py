@@ -8,6 +8,8 @@ class FifteenPuzzleState:
     """
     The Fifteen Puzzle.
     """
+    __slots__ = ('tiles', 'blank', '_hash')
+    rows = cols = 4
 
     def __init__(self, numbers):
         """
@@ -30,22 +32,34 @@ class FifteenPuzzleState:
             | 12 | 13 | 14 | 15 |
             ---------------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is stored as a flat tuple 'tiles'
+        of the 16 numbers in row-major order, with the index of the blank
+        in 'blank'. The 2-dimensional 'cells' list is built on demand.
         """
-        #start task
-        self.cells = []
-        numbers = numbers[:]  # Make a copy
-        numbers.reverse()
-
-        #===== Start Change Task 1 =====*/
-        for row in range(4):
-            self.cells.append([])
-            for col in range(4):
-                self.cells[row].append(numbers.pop())
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
-        #===== End Change Task 1 =====*/
+        self.tiles = tuple(numbers)
+        self.blank = self.tiles.index(0)
+        self._hash = hash(self.tiles)
+
+    @staticmethod
+    def fromTiles(tiles, blank):
+        "Builds a state directly from a tiles tuple and its blank index."
+        state = FifteenPuzzleState.__new__(FifteenPuzzleState)
+        state.tiles = tiles
+        state.blank = blank
+        state._hash = hash(tiles)
+        return state
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, 4)
+
+    @property
+    def cells(self):
+        """
+        The board as a 4x4 list of lists of numbers.
+        """
+        tiles = self.tiles
+        return [list(tiles[0:4]), list(tiles[4:8]), list(tiles[8:12]), list(tiles[12:16])]
 
     def isGoal(self):
         """
@@ -53,79 +67,33 @@ class FifteenPuzzleState:
         (blank in bottom right).
 
         """
-        #===== Start Change Task 1 =====*/
-        current = 1
-        for row in range(4):
-            for col in range(4):
-                if row == 3 and col == 3:  # Bottom right
-                    if self.cells[row][col] != 0:
-                        return False
-                else:
-                    if current != self.cells[row][col]:
-                        return False
-                current += 1
-        return True
-        #===== End Change Task 1 =====*/
+        return self.tiles == GOAL_TILES
+
+    def isSolvable(self):
+        "Returns True if the goal can be reached from this board."
+        return isSolvableBoard(self.tiles)
 
     def legalMoves(self):
         """
-        Returns a list of legal moves from the current state.
+        Returns the legal moves from the current state, read off the move
+        table of the 4x4 board (LEGAL_MOVES).
         """
-        moves = []
-        row, col = self.blankLocation
-        if row != 0:
-            moves.append('up')
+        return LEGAL_MOVES[self.blank]
 
-        #===== Start Change Task 1 =====*/
-        if row != 3:
-            moves.append('down')
-        #===== End Change Task 1 =====*/
-
-        if col != 0:
-            moves.append('left')
-
-        #===== Start Change Task 1 =====*/
-        if col != 3:
-            moves.append('right')
-        #===== End Change Task 1 =====*/
-
-        return moves
-        
 
     def result(self, move):
         """
         Returns a new fifteenPuzzle with the current state and blankLocation
-        updated based on the provided move.
-        """
-        row, col = self.blankLocation
-        if move == 'up':
-            newrow = row - 1
-            newcol = col
-        elif move == 'down':
-            newrow = row + 1
-            newcol = col
-        elif move == 'left':
-            newrow = row
-            newcol = col - 1
-        elif move == 'right':
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current fifteenPuzzle
-
-        #===== Start Change Task 1 =====*/
-        newPuzzle = FifteenPuzzleState([0] * 16) # 16 since it is a puzzle of 15
-        #===== End Change Task 1 =====*/
-
-        newPuzzle.cells = [values[:] for values in self.cells]
-
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-        return newPuzzle
+        updated based on the provided move: a copy of the tiles with the
+        blank and its neighbour swapped.
+        """
+        target = MOVE_TARGETS[self.blank].get(move)
+        if target is None:
+            raise ValueError("Illegal Move: %s" % move)
+        tiles = list(self.tiles)
+        tiles[self.blank] = tiles[target]
+        tiles[target] = 0
+        return FifteenPuzzleState.fromTiles(tuple(tiles), target)
 
     def __eq__(self, other):
         """
@@ -136,15 +104,23 @@ class FifteenPuzzleState:
               FifteenPuzzleState([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 0, 15]).result('right')
           True
         """
-        #===== Start Change Task 1 =====*/
-        for row in range(4):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
-        #===== End Change Task 1 =====*/
+        return self.tiles == other.tiles
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return self._hash
+
+    def pack(self):
+        """
+        Returns the equivalent PackedFifteenPuzzleState.
+        """
+        return PackedFifteenPuzzleState.fromBoard(boardShape(4, 4).pack(self.tiles), self.blank)
+
+    def reflect(self):
+        """
+        Returns the board reflected across the main diagonal (see
+        reflectTiles). It is exactly as far from the goal as this one.
+        """
+        return FifteenPuzzleState(reflectTiles(self.tiles))
 
     def ____getAsciiString(self):
         """
@@ -171,11 +147,562 @@ class FifteenPuzzleState:
     def __str__(self):
         return self.____getAsciiString()
 
+def isSolvableBoard(numbers, rows=4, cols=4):
+    """
+    numbers: a list of integers from 0 to 15, as for FifteenPuzzleState, or
+    from 0 to rows * cols - 1 for a board of another size.
+    Returns True if the goal can be reached from this board.
+
+    Every move swaps the blank with a tile, which flips the parity of the
+    permutation taking the board to the goal and changes the blank's
+    Manhattan distance from the bottom right corner by one. The two
+    parities therefore stay equal on any board reachable from the goal,
+    and the board is solvable exactly when they are. The permutation's
+    parity is found in O(n) from its cycles.
+    """
+    size = rows * cols
+    parity = 0
+    visited = [False] * size
+    for start in range(size):
+        if visited[start]:
+            continue
+        length = 0
+        position = start
+        while not visited[position]:
+            visited[position] = True
+            number = numbers[position]
+            position = number - 1 if number else size - 1  # the number's goal cell
+            length += 1
+        parity += length - 1
+    row, col = divmod(numbers.index(0), cols)
+    return parity % 2 == (rows + cols - 2 - row - col) % 2
+
+# Packed board encoding: the number in cell (row, col) occupies the 4 bits
+# starting at bit 4 * (row * 4 + col) of a single integer.
+GOAL_TILES = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0)
+PACKED_GOAL = sum(number << (4 * position) for position, number in enumerate(GOAL_TILES))
+
+# Change in the blank's position index for each move
+MOVE_OFFSETS = {'up': -4, 'down': 4, 'left': -1, 'right': 1}
+
+# The move that undoes each move
+OPPOSITE_MOVES = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+
+# Reflection across the main diagonal: cell (row, col) goes to (col, row),
+# and every tile is renamed after the cell its goal goes to, so the goal
+# board is its own reflection. A move of the blank turns into the move in
+# REFLECTED_MOVES.
+REFLECTED_POSITION = [(position % 4) * 4 + position // 4 for position in range(16)]
+REFLECTED_TILE = [0] + [REFLECTED_POSITION[tile - 1] + 1 for tile in range(1, 16)]
+REFLECTED_MOVES = {'up': 'left', 'left': 'up', 'down': 'right', 'right': 'down'}
+
+def reflectTiles(tiles):
+    """
+    Reflects a flat row-major board across the main diagonal and returns it
+    as a list. A solution of the reflected board is a solution of the
+    original one with each move replaced by its REFLECTED_MOVES.
+    """
+    reflected = [0] * 16
+    for position, number in enumerate(tiles):
+        reflected[REFLECTED_POSITION[position]] = REFLECTED_TILE[number]
+    return reflected
+
+def packCells(cells):
+    """
+    Packs a 4x4 list of lists of numbers into a single integer.
+    """
+    board = 0
+    for row in range(4):
+        for col in range(4):
+            board |= cells[row][col] << (4 * (row * 4 + col))
+    return board
+
+def unpackCells(board):
+    """
+    Unpacks an integer built by packCells back into a 4x4 list of lists.
+    """
+    return [[(board >> (4 * (row * 4 + col))) & 15 for col in range(4)]
+            for row in range(4)]
+
+# Boards of any size
+MOVES = ('up', 'down', 'left', 'right')
+
+class BoardShape:
+    """
+    Tables for sliding puzzles of rows x cols cells, built once per size
+    (see boardShape) and shared by every board of that size.
+
+    goal: the solved board as a flat tuple, 1 to size - 1 then the blank
+    goalPositions[number]: the cell where number belongs
+    offsets[move]: change in the blank's index for each move
+    moves[cell]: the legal moves of the blank on cell
+    neighbors[cell]: (move, cell the blank moves to) for each legal move
+    bits: bits per cell of packed boards, 4 up to 16 cells and 8 above
+    """
+
+    def __init__(self, rows, cols):
+        if rows < 2 or cols < 2 or rows * cols > 256:
+            raise ValueError('Unsupported board size: %dx%d' % (rows, cols))
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.goal = tuple(range(1, self.size)) + (0,)
+        self.goalPositions = [self.size - 1] + list(range(self.size - 1))
+        self.offsets = {'up': -cols, 'down': cols, 'left': -1, 'right': 1}
+        self.neighbors = []
+        for position in range(self.size):
+            row, col = divmod(position, cols)
+            legal = (row != 0, row != rows - 1, col != 0, col != cols - 1)
+            self.neighbors.append(tuple((move, position + self.offsets[move])
+                                        for move, allowed in zip(MOVES, legal) if allowed))
+        self.moves = [tuple(move for move, _ in neighbors) for neighbors in self.neighbors]
+        self.bits = 4 if self.size <= 16 else 8
+        self.packedGoal = self.pack(self.goal)
+
+    def pack(self, tiles):
+        """
+        Packs a flat board into one integer, the first cell in the lowest
+        bits. For 4x4 boards this is the same as packCells.
+        """
+        board = 0
+        bits = self.bits
+        for position, number in enumerate(tiles):
+            board |= number << (bits * position)
+        return board
+
+    def unpack(self, board):
+        "Unpacks an integer built by pack back into a flat tuple."
+        bits = self.bits
+        mask = (1 << bits) - 1
+        return tuple((board >> (bits * position)) & mask for position in range(self.size))
+
+    def reflect(self, tiles):
+        """
+        Reflects a flat square board across the main diagonal, relabelling
+        the tiles as reflectTiles does for 4x4 boards. Returns a list.
+        """
+        if self.rows != self.cols:
+            raise ValueError('Only square boards can be reflected')
+        n = self.rows
+        reflected = [0] * self.size
+        for position, number in enumerate(tiles):
+            if number:
+                goalRow, goalCol = divmod(number - 1, n)
+                number = goalCol * n + goalRow + 1
+            row, col = divmod(position, n)
+            reflected[col * n + row] = number
+        return reflected
+
+_boardShapes = {}
+
+def boardShape(rows, cols):
+    "Returns the shared BoardShape of rows x cols boards."
+    shape = _boardShapes.get((rows, cols))
+    if shape is None:
+        shape = _boardShapes[rows, cols] = BoardShape(rows, cols)
+    return shape
+
+# LEGAL_MOVES[cell]: the legal moves of the blank on each cell of the 4x4 board
+LEGAL_MOVES = boardShape(4, 4).moves
+
+# MOVE_TARGETS[cell][move]: the cell the blank on cell moves to
+MOVE_TARGETS = [dict(neighbors) for neighbors in boardShape(4, 4).neighbors]
+
+# Move pruning
+class MovePruner:
+    """
+    A finite state machine over move sequences (an Aho-Corasick automaton)
+    that rejects every move completing one of the forbidden sequences. A
+    depth-first search keeps one machine state per node, starting from
+    start, and skips the moves missing from transitions[state]:
+
+        nextState = pruner.transitions[state].get(move)   # None: prune
+
+    forbidden: the move sequences to reject, as tuples of moves
+    """
+
+    def __init__(self, forbidden, moves=MOVES):
+        self.forbidden = forbidden
+        self.start = 0
+        # trie of the forbidden sequences; a node is final if a sequence
+        # ends there or at any suffix of it
+        children = [{}]
+        final = [False]
+        for sequence in forbidden:
+            node = 0
+            for move in sequence:
+                if move not in children[node]:
+                    children[node][move] = len(children)
+                    children.append({})
+                    final.append(False)
+                node = children[node][move]
+            final[node] = True
+        # breadth-first over the trie, following failure links for missing moves
+        self.transitions = [None] * len(children)
+        failure = [0] * len(children)
+        transitions = [dict() for _ in children]
+        queue = [0]
+        for node in queue:
+            for move in moves:
+                if move in children[node]:
+                    child = children[node][move]
+                    failure[child] = transitions[failure[node]][move] if node else 0
+                    final[child] = final[child] or final[failure[child]]
+                    transitions[node][move] = child
+                    queue.append(child)
+                else:
+                    transitions[node][move] = transitions[failure[node]][move] if node else 0
+        for node in range(len(children)):
+            self.transitions[node] = dict((move, target) for move, target in transitions[node].items()
+                                          if not final[target])
+
+def findDuplicateSequences(shape, maxLength):
+    """
+    Returns the shortest move sequences of up to maxLength moves that can
+    be left out of a depth-first search of boards of the given BoardShape:
+    those with an equivalent sequence that is shorter, or as long and
+    earlier in MOVES order, and that is legal from every cell where they
+    are. Equivalent means leading to the same board from the same start.
+    Longer sequences containing one of these are not listed; a MovePruner
+    rejects them anyway.
+
+    At least one shortest path to every board keeps none of the sequences,
+    so pruning them keeps depth-first searches like IDA* optimal.
+    """
+    start = tuple(range(shape.size))
+
+    def extend(boards, move):
+        "The boards after move, by blank start cell; None where the sequence is illegal."
+        extended = []
+        for tiles in boards:
+            if tiles is None:
+                extended.append(None)
+                continue
+            blank = tiles.index(0)
+            for neighborMove, target in shape.neighbors[blank]:
+                if neighborMove == move:
+                    cells = list(tiles)
+                    cells[blank], cells[target] = cells[target], 0
+                    extended.append(tuple(cells))
+                    break
+            else:
+                extended.append(None)
+        return extended
+
+    # the board reached from each start cell by the empty sequence
+    empty = []
+    for blank in range(shape.size):
+        tiles = list(start)
+        tiles[0], tiles[blank] = tiles[blank], 0
+        empty.append(tuple(tiles))
+    # kept sequences by (start cell, board reached), in preferred order
+    kept = {}
+    for cell, tiles in enumerate(empty):
+        kept[cell, tiles] = set([()])
+    forbidden = []
+    forbiddenSet = set()
+    layer = [((), empty)]
+    for length in range(1, maxLength + 1):
+        nextLayer = []
+        for sequence, boards in layer:
+            for move in MOVES:
+                candidate = sequence + (move,)
+                if any(candidate[i:] in forbiddenSet for i in range(1, length)):
+                    continue
+                reached = extend(boards, move)
+                cells = [cell for cell in range(shape.size) if reached[cell] is not None]
+                if not cells:
+                    continue
+                equivalent = set(kept.get((cells[0], reached[cells[0]]), ()))
+                for cell in cells[1:]:
+                    if not equivalent:
+                        break
+                    equivalent &= kept.get((cell, reached[cell]), set())
+                if equivalent:
+                    forbidden.append(candidate)
+                    forbiddenSet.add(candidate)
+                    continue
+                for cell in cells:
+                    kept.setdefault((cell, reached[cell]), set()).add(candidate)
+                nextLayer.append((candidate, reached))
+        layer = nextLayer
+    return forbidden
+
+_movePruners = {}
+
+def movePruner(rows=4, cols=4, maxLength=10):
+    """
+    Returns a shared MovePruner of the duplicate sequences of up to
+    maxLength moves on rows x cols boards (see findDuplicateSequences),
+    e.g. for search.idaStarSearch(problem, heuristic, pruner=movePruner()).
+    """
+    key = (rows, cols, maxLength)
+    if key not in _movePruners:
+        _movePruners[key] = MovePruner(findDuplicateSequences(boardShape(rows, cols), maxLength))
+    return _movePruners[key]
+
+class SlidingPuzzleState:
+    """
+    A sliding puzzle of any size, like the Eight Puzzle (3x3) or the
+    Twenty-four Puzzle (5x5), with the same interface as
+    FifteenPuzzleState. The board is a flat tuple of numbers; legal moves
+    and the goal come from the BoardShape of its size.
+
+        SlidingPuzzleState([1, 2, 3, 4, 5, 6, 7, 0, 8], 3, 3)
+    """
+    __slots__ = ('tiles', 'blank', 'shape')
+
+    def __init__(self, numbers, rows, cols=None):
+        """
+        numbers: the integers from 0 to rows * cols - 1 in row-major order,
+        0 being the blank. cols defaults to rows.
+        """
+        shape = boardShape(rows, rows if cols is None else cols)
+        if sorted(numbers) != list(range(shape.size)):
+            raise ValueError('Not a %dx%d puzzle: %s' % (shape.rows, shape.cols, numbers))
+        self.tiles = tuple(numbers)
+        self.blank = self.tiles.index(0)
+        self.shape = shape
+
+    @staticmethod
+    def fromTiles(tiles, blank, shape):
+        "Builds a state directly from a tiles tuple, its blank index and its BoardShape."
+        state = SlidingPuzzleState.__new__(SlidingPuzzleState)
+        state.tiles = tiles
+        state.blank = blank
+        state.shape = shape
+        return state
+
+    @property
+    def rows(self):
+        return self.shape.rows
+
+    @property
+    def cols(self):
+        return self.shape.cols
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, self.shape.cols)
+
+    @property
+    def cells(self):
+        cols = self.shape.cols
+        return [list(self.tiles[start:start + cols]) for start in range(0, self.shape.size, cols)]
+
+    def isGoal(self):
+        return self.tiles == self.shape.goal
+
+    def isSolvable(self):
+        "Returns True if the goal can be reached from this board."
+        return isSolvableBoard(self.tiles, self.shape.rows, self.shape.cols)
+
+    def legalMoves(self):
+        return self.shape.moves[self.blank]
+
+    def result(self, move):
+        """
+        Returns a new state with the blank swapped with its neighbour in the
+        direction of move.
+        """
+        for neighborMove, target in self.shape.neighbors[self.blank]:
+            if neighborMove == move:
+                break
+        else:
+            raise ValueError("Illegal Move: %s" % move)
+        tiles = list(self.tiles)
+        tiles[self.blank] = tiles[target]
+        tiles[target] = 0
+        return SlidingPuzzleState.fromTiles(tuple(tiles), target, self.shape)
+
+    def pack(self):
+        "Returns the board packed into one integer (see BoardShape.pack)."
+        return self.shape.pack(self.tiles)
+
+    def reflect(self):
+        "Returns the board reflected across the main diagonal; square boards only."
+        return SlidingPuzzleState(self.shape.reflect(self.tiles), self.shape.rows, self.shape.cols)
+
+    def __eq__(self, other):
+        return self.tiles == other.tiles
+
+    def __hash__(self):
+        return hash(self.tiles)
+
+    def __str__(self):
+        horizontalLine = '-' * (5 * self.shape.cols + 1)
+        lines = [horizontalLine]
+        for row in self.cells:
+            lines.append('|' + ''.join(' %s |' % (str(number) if number else ' ').ljust(2)
+                                       for number in row))
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+class PackedFifteenPuzzleState:
+    """
+    A compact Fifteen Puzzle state: the whole board is a single integer of
+    16 nibbles (see packCells) plus the index of the blank cell.
+
+    It offers the same interface as FifteenPuzzleState, so it can be used
+    anywhere a state is expected, but moves are bit swaps and hashing and
+    equality work on one integer.
+    """
+    __slots__ = ('board', 'blank')
+    rows = cols = 4
+
+    def __init__(self, numbers):
+        """
+        numbers: a list of integers from 0 to 15, as for FifteenPuzzleState.
+        """
+        self.board = 0
+        for position, number in enumerate(numbers):
+            self.board |= number << (4 * position)
+        self.blank = numbers.index(0)
+
+    @staticmethod
+    def fromBoard(board, blank):
+        "Builds a state directly from a packed board and its blank index."
+        state = PackedFifteenPuzzleState.__new__(PackedFifteenPuzzleState)
+        state.board = board
+        state.blank = blank
+        return state
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, 4)
+
+    @property
+    def cells(self):
+        return unpackCells(self.board)
+
+    @property
+    def tiles(self):
+        """
+        The board as a flat tuple of 16 numbers in row-major order.
+        """
+        board = self.board
+        return tuple((board >> shift) & 15 for shift in range(0, 64, 4))
+
+    def isGoal(self):
+        return self.board == PACKED_GOAL
+
+    def isSolvable(self):
+        "Returns True if the goal can be reached from this board."
+        return isSolvableBoard(list(self.tiles))
+
+    def legalMoves(self):
+        return LEGAL_MOVES[self.blank]
+
+    def result(self, move):
+        """
+        Returns a new state with the blank swapped with its neighbour in the
+        direction of move. The blank's nibble is zero, so the swap is just
+        moving the neighbour's number into it.
+        """
+        blank = self.blank
+        newBlank = MOVE_TARGETS[blank].get(move)
+        if newBlank is None:
+            raise ValueError("Illegal Move: %s" % move)
+        number = (self.board >> (4 * newBlank)) & 15
+        board = self.board - (number << (4 * newBlank)) + (number << (4 * blank))
+        return PackedFifteenPuzzleState.fromBoard(board, newBlank)
+
+    def unpack(self):
+        """
+        Returns the equivalent FifteenPuzzleState.
+        """
+        return FifteenPuzzleState.fromTiles(self.tiles, self.blank)
+
+    def reflect(self):
+        "Returns the board reflected across the main diagonal (see reflectTiles)."
+        return PackedFifteenPuzzleState(reflectTiles(self.tiles))
+
+    def __eq__(self, other):
+        return self.board == other.board
+
+    def __hash__(self):
+        return hash(self.board)
+
+    def __str__(self):
+        return str(self.unpack())
+
+class FifteenPuzzleBoard:
+    """
+    A single mutable Fifteen Puzzle board for depth-first solvers.
+
+    Instead of returning a new state like result(), apply() swaps two cells
+    in place and undo() swaps them back, so a search can walk the whole tree
+    with one board and no allocation per node. Boards of other sizes are
+    made by passing rows and cols.
+    """
+
+    def __init__(self, numbers, rows=4, cols=4):
+        """
+        numbers: a list of integers from 0 to 15, as for FifteenPuzzleState,
+        or from 0 to rows * cols - 1.
+        """
+        self.shape = boardShape(rows, cols)
+        self.rows = rows
+        self.cols = cols
+        self.tiles = list(numbers)
+        self.blank = self.tiles.index(0)
+        self.goal = list(self.shape.goal)
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, self.cols)
+
+    @property
+    def cells(self):
+        tiles = self.tiles
+        cols = self.cols
+        return [tiles[start:start + cols] for start in range(0, len(tiles), cols)]
+
+    def isGoal(self):
+        return self.tiles == self.goal
+
+    def isSolvable(self):
+        "Returns True if the goal can be reached from this board."
+        return isSolvableBoard(self.tiles, self.rows, self.cols)
+
+    def legalMoves(self):
+        return self.shape.moves[self.blank]
+
+    def apply(self, move):
+        "Slides the blank in the direction of move, in place."
+        tiles = self.tiles
+        blank = self.blank
+        newBlank = blank + self.shape.offsets[move]
+        tiles[blank] = tiles[newBlank]
+        tiles[newBlank] = 0
+        self.blank = newBlank
+
+    def undo(self, move):
+        "Reverts a previous apply(move)."
+        self.apply(OPPOSITE_MOVES[move])
+
+    def snapshot(self):
+        """
+        Returns an immutable FifteenPuzzleState of the current board, or a
+        SlidingPuzzleState if it is not 4x4.
+        """
+        if self.rows == 4 and self.cols == 4:
+            return FifteenPuzzleState.fromTiles(tuple(self.tiles), self.blank)
+        return SlidingPuzzleState(self.tiles, self.rows, self.cols)
+
+    def reflect(self):
+        "Returns a new board reflected across the main diagonal (see reflectTiles)."
+        return FifteenPuzzleBoard(self.shape.reflect(self.tiles), self.rows, self.cols)
+
+    def __str__(self):
+        return str(self.snapshot())
+
 # TODO: Implement The methods in this class
 class FifteenPuzzleSearchProblem(search.SearchProblem):
     """
     Implementation of a SearchProblem for the Fifteen Puzzle domain
-    Each state is represented by an instance of a fifteenPuzzle.
+    Each state is represented by an instance of a fifteenPuzzle, or of a
+    SlidingPuzzleState for boards of other sizes.
     """
 
     def __init__(self, puzzle):
@@ -185,9 +712,18 @@ class FifteenPuzzleSearchProblem(search.SearchProblem):
     def getStartState(self):
         return self.puzzle
 
+    def getGoalState(self):
+        "The solved puzzle, as the same kind of state as the start state."
+        if isinstance(self.puzzle, SlidingPuzzleState):
+            return SlidingPuzzleState(self.puzzle.shape.goal, self.puzzle.rows, self.puzzle.cols)
+        return self.puzzle.__class__([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
+
     def isGoalState(self, state):
         return state.isGoal()
 
+    def isSolvable(self):
+        return self.puzzle.isSolvable()
+
     def getSuccessors(self, state):
         """
         Returns list of (successor, action, stepCost) pairs where
@@ -199,6 +735,16 @@ class FifteenPuzzleSearchProblem(search.SearchProblem):
             succ.append((state.result(a), a, 1))
         return succ
 
+    def getSuccessorsAfter(self, state, lastAction):
+        """
+        Yields the successors of getSuccessors one at a time, leaving out
+        the move that undoes lastAction.
+        """
+        inverse = OPPOSITE_MOVES.get(lastAction)
+        for a in state.legalMoves():
+            if a != inverse:
+                yield state.result(a), a, 1
+
     def getCostOfActions(self, actions):
         """
         actions: A list of actions to take
@@ -207,6 +753,17 @@ class FifteenPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+    def getStartBoard(self):
+        """
+        Returns a fresh mutable FifteenPuzzleBoard of the start state, for
+        solvers that apply and undo moves in place (see search.idaStarSearch).
+        """
+        return FifteenPuzzleBoard(list(self.puzzle.tiles), self.puzzle.rows, self.puzzle.cols)
+
+    def getInverseAction(self, action):
+        "Returns the action that undoes 'action'."
+        return OPPOSITE_MOVES[action]
+
 
 FIFTEEN_PUZZLE_DATA = [
     [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0],
@@ -261,23 +818,29 @@ if __name__ == '__main__':
         print("2. h2 (Euclidean distance)")
         print("3. h3 (Manhattan distance)")
         print("4. h4 (Out of row + Out of column)")
-        print("5. Quit")
+        print("5. Linear conflict")
+        print("6. Walking distance")
+        print("7. Quit")
 
-        choice = input("Enter your choice (1/2/3/4/5): ")
+        choice = input("Enter your choice (1/2/3/4/5/6/7): ")
 
         if choice == '1':
             heuristic = heuristics.h1
         elif choice == '2':
             heuristic = heuristics.h2
         elif choice == '3':
-            heuristic = heuristics.h3
+            heuristic = heuristics.manhattan
         elif choice == '4':
             heuristic = heuristics.h4
         elif choice == '5':
+            heuristic = heuristics.linearConflict
+        elif choice == '6':
+            heuristic = heuristics.walkingDistance
+        elif choice == '7':
             print("Goodbye!")
             break
         else:
-            print("Invalid choice. Please select 1, 2,3,4 or 5.")
+            print("Invalid choice. Please select 1, 2, 3, 4, 5, 6 or 7.")
             continue
 
         puzzle = createRandomFifteenPuzzle(25)
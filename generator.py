@@ -0,0 +1,139 @@
+# generator.py
+"""
+Reproducible streams of random puzzles, for benchmarks and load tests.
+
+    for board in randomBoards(1000, seed=42):
+        numbers = fifteenpuzzle.boardShape(4, 4).unpack(board)
+
+Boards are streamed packed into integers (see fifteenpuzzle.BoardShape.pack).
+randomBoards draws uniformly random solvable permutations, exactDepthBoards
+boards whose optimal solution has exactly a given number of moves, and
+randomBoardBatches whole NumPy arrays of packed 4x4 boards at a time (see
+vectorized.randomSolvableBoards).
+
+Every stream is determined by its seed: an integer, a random.Random, or a
+util.FixedRandom, which is also the default. From the command line, one
+puzzle of 16 numbers per line, as read by batch.py:
+
+    python generator.py 1000 --seed 42 > puzzles.txt
+    python generator.py 100 --depth 40 | python batch.py
+"""
+
+import random
+import sys
+
+import fifteenpuzzle
+import heuristics
+import search
+import util
+
+def randomSource(seed=None):
+    """
+    Returns the random.Random a stream draws from: a new util.FixedRandom
+    stream for None, the Random of a util.FixedRandom, a Random as is, and
+    a new Random seeded with anything else.
+    """
+    if seed is None:
+        seed = util.FixedRandom()
+    if isinstance(seed, util.FixedRandom):
+        return seed.random
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+def randomSolvableNumbers(rng, rows=4, cols=4):
+    """
+    A uniformly random solvable board of rows x cols, as a list of numbers.
+    The numbers are shuffled, and the first two tiles are swapped if the
+    board is unsolvable; that swap pairs every unsolvable board with exactly
+    one solvable board, so each solvable board is equally likely.
+    """
+    numbers = list(fifteenpuzzle.boardShape(rows, cols).goal)
+    rng.shuffle(numbers)
+    if not fifteenpuzzle.isSolvableBoard(numbers, rows, cols):
+        first, second = [i for i, number in enumerate(numbers) if number != 0][:2]
+        numbers[first], numbers[second] = numbers[second], numbers[first]
+    return numbers
+
+def randomBoards(count=None, seed=None, rows=4, cols=4):
+    """
+    Yields count (forever if None) uniformly random solvable boards of
+    rows x cols, packed into integers.
+    """
+    rng = randomSource(seed)
+    shape = fifteenpuzzle.boardShape(rows, cols)
+    generated = 0
+    while count is None or generated < count:
+        yield shape.pack(randomSolvableNumbers(rng, rows, cols))
+        generated += 1
+
+def exactDepthBoards(depth, count=None, seed=None, rows=4, cols=4, heuristic='linearConflict'):
+    """
+    Yields count (forever if None) packed boards of rows x cols whose
+    optimal solution is exactly depth moves long.
+
+    Each candidate is a random walk of depth moves from the goal that never
+    undoes its previous move, so it is at most depth moves away. It is kept
+    right away if the heuristic already says depth, and otherwise only if
+    search.idaStarSearch with move pruning needs all depth moves. The
+    searches make this practical up to about 50 moves on the 4x4 board.
+    """
+    rng = randomSource(seed)
+    shape = fifteenpuzzle.boardShape(rows, cols)
+    h = heuristics.forSize(heuristic, rows, cols)
+    pruner = fifteenpuzzle.movePruner(rows, cols)
+    generated = 0
+    while count is None or generated < count:
+        board = fifteenpuzzle.FifteenPuzzleBoard(shape.goal, rows, cols)
+        last = None
+        for _ in range(depth):
+            choices = [move for move in board.legalMoves()
+                       if move != fifteenpuzzle.OPPOSITE_MOVES.get(last)]
+            last = rng.choice(choices)
+            board.apply(last)
+        if h(board) != depth:
+            problem = fifteenpuzzle.FifteenPuzzleSearchProblem(board.snapshot())
+            if len(search.idaStarSearch(problem, h, pruner=pruner)) != depth:
+                continue
+        yield shape.pack(board.tiles)
+        generated += 1
+
+def randomBoardBatches(count=None, seed=None, batchSize=100000):
+    """
+    Yields uniformly random solvable 4x4 boards as NumPy arrays of at most
+    batchSize packed uint64 boards (see vectorized.packBoards), count boards
+    in all (forever if None). Needs NumPy.
+
+    The NumPy generator is seeded with 64 bits drawn from randomSource(seed),
+    so a seed gives the same batches every time, though not the same boards
+    as randomBoards.
+    """
+    import numpy as np
+    import vectorized
+    rng = np.random.default_rng(randomSource(seed).getrandbits(64))
+    generated = 0
+    while count is None or generated < count:
+        size = batchSize if count is None else min(batchSize, count - generated)
+        yield vectorized.packBoards(vectorized.randomSolvableBoards(size, rng))
+        generated += size
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Write random solvable puzzles, one per line of numbers.')
+    parser.add_argument('count', type=int, help='number of puzzles')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='random seed (default: the fixed stream of util.FixedRandom)')
+    parser.add_argument('--depth', type=int, default=None,
+                        help='optimal solution length of every puzzle (default: uniformly random)')
+    parser.add_argument('--rows', type=int, default=4, help='board rows (default: %(default)s)')
+    parser.add_argument('--cols', type=int, default=4, help='board columns (default: %(default)s)')
+    options = parser.parse_args()
+
+    if options.depth is None:
+        boards = randomBoards(options.count, options.seed, options.rows, options.cols)
+    else:
+        boards = exactDepthBoards(options.depth, options.count, options.seed, options.rows, options.cols)
+    shape = fifteenpuzzle.boardShape(options.rows, options.cols)
+    for board in boards:
+        sys.stdout.write(' '.join(str(number) for number in shape.unpack(board)) + '\n')
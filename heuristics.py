@@ -1,3 +1,5 @@
+import util
+
 # Implementation of the h1 heuristic
 def h1(state, problem=None):
     """
@@ -7,13 +9,15 @@ def h1(state, problem=None):
     """
     misplaced_tiles = 0
     current = 1
-    for row in range(4):
-        for col in range(4):
-            if row == 3 and col == 3:  # Last cell should be 0 (blank)
-                if state.cells[row][col] != 0:
+    cells = state.cells
+    rows, cols = len(cells), len(cells[0])
+    for row in range(rows):
+        for col in range(cols):
+            if row == rows - 1 and col == cols - 1:  # Last cell should be 0 (blank)
+                if cells[row][col] != 0:
                     misplaced_tiles += 1
             else:
-                if state.cells[row][col] != current:
+                if cells[row][col] != current:
                     misplaced_tiles += 1
                 current += 1
     return misplaced_tiles
@@ -27,22 +31,16 @@ def h2(state, problem=None):
         float: The h2 heuristic value.
     """
     euclidean_distance = 0.0
-    current = 1
-    for row in range(4):
-        for col in range(4):
-            if row == 3 and col == 3:  # Last cell should be 0 (blank)
-                if state.cells[row][col] != 0:
-                    goal_row, goal_col = 3, 3
-                    dx = row - goal_row
-                    dy = col - goal_col
-                    euclidean_distance += (dx ** 2 + dy ** 2) ** 0.5
-            else:
-                if state.cells[row][col] != current:
-                    goal_row, goal_col = divmod(current - 1, 4)
-                    dx = row - goal_row
-                    dy = col - goal_col
-                    euclidean_distance += (dx ** 2 + dy ** 2) ** 0.5
-                current += 1
+    cells = state.cells
+    rows, cols = len(cells), len(cells[0])
+    for row in range(rows):
+        for col in range(cols):
+            tile = cells[row][col]
+            if tile != 0:  # The blank does not count
+                goal_row, goal_col = divmod(tile - 1, cols)
+                dx = row - goal_row
+                dy = col - goal_col
+                euclidean_distance += (dx ** 2 + dy ** 2) ** 0.5
     return euclidean_distance
 
 # Implementation of the h3 heuristic
@@ -53,18 +51,14 @@ def h3(state, problem=None):
         int: The h3 heuristic value.
     """
     manhattan_distance = 0
-    current = 1
-    for row in range(4):
-        for col in range(4):
-            if row == 3 and col == 3:  # Last cell should be 0 (blank)
-                if state.cells[row][col] != 0:
-                    goal_row, goal_col = 3, 3
-                    manhattan_distance += abs(row - goal_row) + abs(col - goal_col)
-            else:
-                if state.cells[row][col] != current:
-                    goal_row, goal_col = divmod(current - 1, 4)
-                    manhattan_distance += abs(row - goal_row) + abs(col - goal_col)
-                current += 1
+    cells = state.cells
+    rows, cols = len(cells), len(cells[0])
+    for row in range(rows):
+        for col in range(cols):
+            tile = cells[row][col]
+            if tile != 0:  # The blank does not count
+                goal_row, goal_col = divmod(tile - 1, cols)
+                manhattan_distance += abs(row - goal_row) + abs(col - goal_col)
     return manhattan_distance
 
 
@@ -77,21 +71,458 @@ def h4(state, problem=None):
     """
     out_of_row = 0
     out_of_column = 0
-    current = 1
-    for row in range(4):
-        for col in range(4):
-            if row == 3 and col == 3:  # Last cell should be 0 (blank)
-                if state.cells[row][col] != 0:
+    cells = state.cells
+    rows, cols = len(cells), len(cells[0])
+    for row in range(rows):
+        for col in range(cols):
+            tile = cells[row][col]
+            if tile != 0:  # The blank does not count
+                goal_row, goal_col = divmod(tile - 1, cols)
+                if row != goal_row:
                     out_of_row += 1
+                if col != goal_col:
                     out_of_column += 1
-            else:
-                if state.cells[row][col] != current:
-                    goal_row, goal_col = divmod(current - 1, 4)
-                    if row != goal_row:
-                        out_of_row += 1
-                    if col != goal_col:
-                        out_of_column += 1
-                current += 1
     return out_of_row + out_of_column
 
 
+def manhattanTo(target):
+    """
+    Returns a heuristic(state, problem) giving the Manhattan distance from a
+    state to the state target rather than to the goal, e.g. for the
+    backward half of search.bidirectionalAStarSearch:
+
+        heuristics.manhattanTo(problem.getStartState())
+    """
+    size, cols = len(target.tiles), target.cols
+    where = [0] * size
+    for position, tile in enumerate(target.tiles):
+        where[tile] = position
+    distance = [[0] * size] + [
+        [abs(position // cols - where[tile] // cols) + abs(position % cols - where[tile] % cols)
+         for position in range(size)]
+        for tile in range(1, size)]
+
+    def heuristic(state, problem=None):
+        h = 0
+        for position, tile in enumerate(state.tiles):
+            h += distance[tile][position]
+        return h
+    return heuristic
+
+def maxOverReflection(heuristic):
+    """
+    Returns a heuristic(state, problem) taking the larger of heuristic on
+    the state and on its reflection across the main diagonal
+    (state.reflect()). Reflection keeps the distance to the goal, so the
+    result is admissible if heuristic is. It only helps heuristics that are
+    not symmetric themselves, like pattern databases whose tile groups do
+    not map onto each other: Manhattan distance, linear conflict and
+    walking distance give the same value on both boards.
+    """
+    def reflectedHeuristic(state, problem=None):
+        return max(heuristic(state, problem), heuristic(state.reflect(), problem))
+    return reflectedHeuristic
+
+# Incremental heuristics
+class IncrementalHeuristic:
+    """
+    A heuristic that can be updated in O(1) after a single move.
+
+    It is still an ordinary heuristic(state, problem) callable. Searches that
+    know about it (search.aStarSearch, search.idaStarSearch) instead call
+    initial(state) once for the start state and update(token, action,
+    succState) for every successor. Both return a pair (h, token), where the
+    token is whatever the heuristic needs to carry from a state to its
+    successors.
+    """
+
+    def __call__(self, state, problem=None):
+        return self.initial(state)[0]
+
+    def initial(self, state):
+        util.raiseNotDefined()
+
+    def update(self, token, action, succState):
+        util.raiseNotDefined()
+
+# Tables for boards of any size, built once per size
+_tables = {}
+
+def _cached(name, rows, cols, build):
+    key = (name, rows, cols)
+    if key not in _tables:
+        _tables[key] = build(rows, cols)
+    return _tables[key]
+
+def blankOffsets(rows, cols):
+    "Change in the blank's position index for each move."
+    return {'up': -cols, 'down': cols, 'left': -1, 'right': 1}
+
+def _checkSize(heuristic, tiles, cols):
+    if len(tiles) != heuristic.size or cols != heuristic.cols:
+        raise ValueError('%s is for %dx%d boards' % (heuristic.__class__.__name__,
+                                                     heuristic.rows, heuristic.cols))
+
+def _manhattanTables(rows, cols):
+    """
+    Returns (distance, delta): distance[tile][position] is the distance of
+    tile from its goal cell, and delta[tile][source * size + target] the
+    change in it when tile slides from cell source to cell target.
+    """
+    size = rows * cols
+    distance = [[0] * size] + [
+        [abs(position // cols - (tile - 1) // cols) + abs(position % cols - (tile - 1) % cols)
+         for position in range(size)]
+        for tile in range(1, size)]
+    delta = [
+        [distance[tile][target] - distance[tile][source]
+         for source in range(size) for target in range(size)]
+        for tile in range(size)]
+    return distance, delta
+
+def manhattanTables(rows=4, cols=4):
+    return _cached('manhattan', rows, cols, _manhattanTables)
+
+BLANK_OFFSETS = blankOffsets(4, 4)
+# MANHATTAN_DISTANCE[tile][position] and MANHATTAN_DELTA[tile][source * 16 + target]
+# of the Fifteen Puzzle (see _manhattanTables)
+MANHATTAN_DISTANCE, MANHATTAN_DELTA = manhattanTables(4, 4)
+
+class ManhattanHeuristic(IncrementalHeuristic):
+    """
+    Same values as h3; a move changes the distance of the one tile that
+    slides, so the successor's value is read off the delta table. The
+    token is h itself. An instance works on boards of one size, rows x
+    cols (see forSize).
+    """
+
+    def __init__(self, rows=4, cols=4):
+        self.rows, self.cols, self.size = rows, cols, rows * cols
+        self.distance, self.delta = manhattanTables(rows, cols)
+        self.offsets = blankOffsets(rows, cols)
+        self.update = self._updater()
+
+    def initial(self, state):
+        tiles = state.tiles
+        _checkSize(self, tiles, state.cols)
+        distance = self.distance
+        h = 0
+        for position, tile in enumerate(tiles):
+            h += distance[tile][position]
+        return h, h
+
+    def _updater(self):
+        """
+        Builds update(token, action, succState) with this size's tables
+        bound as closure variables, which are faster to read than
+        attributes of self.
+        """
+        cols, size, offsets, delta = self.cols, self.size, self.offsets, self.delta
+
+        def update(token, action, succState):
+            row, col = succState.blankLocation
+            source = row * cols + col
+            target = source - offsets[action]
+            h = token + delta[succState.tiles[target]][source * size + target]
+            return h, h
+        return update
+
+manhattan = ManhattanHeuristic()
+
+
+# Linear conflict
+def _lineConflicts(goals):
+    """
+    goals: goal offsets along a line of the tiles that belong to that line,
+    in the order they currently appear. Returns the fewest tiles that must
+    leave the line so the rest are in order (the length minus the longest
+    increasing subsequence); each of them costs at least two extra moves.
+    """
+    longest = [1] * len(goals)
+    for i in range(len(goals)):
+        for j in range(i):
+            if goals[j] < goals[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return len(goals) - max(longest + [0])
+
+def _linearConflictTables(rows, cols):
+    """
+    A line (row or column) is coded as sum(value * base ** i) over its
+    cells, where base is max(rows, cols) + 1 and value is the goal offset
+    along the line of a tile that belongs to the line, or base - 1 for any
+    other tile and the blank.
+
+    Returns (base, rowConflicts, columnConflicts, rowValue, columnValue):
+    the conflicts of every row code and column code, and the value of each
+    tile in each row's and each column's code.
+    """
+    base = max(rows, cols) + 1
+    other = base - 1
+    size = rows * cols
+
+    def conflicts(length):
+        table = []
+        for code in range(base ** length):
+            values = []
+            for _ in range(length):
+                values.append(code % base)
+                code //= base
+            table.append(_lineConflicts([v for v in values if v != other]))
+        return table
+
+    rowValue = [[other] + [(tile - 1) % cols if (tile - 1) // cols == row else other
+                           for tile in range(1, size)]
+                for row in range(rows)]
+    columnValue = [[other] + [(tile - 1) // cols if (tile - 1) % cols == col else other
+                              for tile in range(1, size)]
+                   for col in range(cols)]
+    return base, conflicts(cols), conflicts(rows), rowValue, columnValue
+
+def linearConflictTables(rows=4, cols=4):
+    return _cached('linearConflict', rows, cols, _linearConflictTables)
+
+# LINE_CONFLICTS, ROW_VALUE and COLUMN_VALUE of the Fifteen Puzzle, in base 5
+_, LINE_CONFLICTS, _, ROW_VALUE, COLUMN_VALUE = linearConflictTables(4, 4)
+
+def _rowCode(tiles, row):
+    values = ROW_VALUE[row]
+    start = row * 4
+    return (values[tiles[start]] + 5 * values[tiles[start + 1]] +
+            25 * values[tiles[start + 2]] + 125 * values[tiles[start + 3]])
+
+def _columnCode(tiles, col):
+    values = COLUMN_VALUE[col]
+    return (values[tiles[col]] + 5 * values[tiles[col + 4]] +
+            25 * values[tiles[col + 8]] + 125 * values[tiles[col + 12]])
+
+def _lineCoders(rows, cols):
+    """
+    Returns (rowCode, columnCode) functions of (tiles, line) for rows x cols
+    boards; the unrolled _rowCode and _columnCode for 4x4.
+    """
+    if (rows, cols) == (4, 4):
+        return _rowCode, _columnCode
+    base, _, _, rowValue, columnValue = linearConflictTables(rows, cols)
+    size = rows * cols
+
+    def rowCode(tiles, row):
+        values = rowValue[row]
+        code = 0
+        for position in range(row * cols + cols - 1, row * cols - 1, -1):
+            code = code * base + values[tiles[position]]
+        return code
+
+    def columnCode(tiles, col):
+        values = columnValue[col]
+        code = 0
+        for position in range(size - cols + col, -1, -cols):
+            code = code * base + values[tiles[position]]
+        return code
+    return rowCode, columnCode
+
+class LinearConflictHeuristic(IncrementalHeuristic):
+    """
+    Manhattan distance plus two moves for every tile that has to leave its
+    goal row or column to let another tile of the same line past it.
+    Admissible, and never smaller than h3.
+
+    A vertical move changes the Manhattan distance of one tile and the
+    contents of the two rows it moves between; the columns keep their
+    order. A horizontal move is the same with rows and columns swapped. The
+    token is h itself. An instance works on boards of one size, rows x
+    cols (see forSize).
+    """
+
+    def __init__(self, rows=4, cols=4):
+        self.rows, self.cols, self.size = rows, cols, rows * cols
+        self.distance, self.delta = manhattanTables(rows, cols)
+        self.offsets = blankOffsets(rows, cols)
+        self.base, self.rowConflicts, self.columnConflicts, self.rowValue, self.columnValue = \
+            linearConflictTables(rows, cols)
+        self.rowCode, self.columnCode = _lineCoders(rows, cols)
+        self.update = self._updater()
+
+    def initial(self, state):
+        tiles = state.tiles
+        _checkSize(self, tiles, state.cols)
+        distance = self.distance
+        h = 0
+        for position, tile in enumerate(tiles):
+            h += distance[tile][position]
+        for row in range(self.rows):
+            h += 2 * self.rowConflicts[self.rowCode(tiles, row)]
+        for col in range(self.cols):
+            h += 2 * self.columnConflicts[self.columnCode(tiles, col)]
+        return h, h
+
+    def _updater(self):
+        "Builds update(token, action, succState), as ManhattanHeuristic._updater does."
+        cols, size, offsets, delta = self.cols, self.size, self.offsets, self.delta
+        rowCode, rowValue, rowConflicts = self.rowCode, self.rowValue, self.rowConflicts
+        columnCode, columnValue, columnConflicts = self.columnCode, self.columnValue, self.columnConflicts
+        other = self.base - 1
+        powers = [self.base ** offset for offset in range(max(self.rows, cols))]
+
+        def update(token, action, succState):
+            tiles = succState.tiles
+            row, col = succState.blankLocation
+            source = row * cols + col
+            target = source - offsets[action]
+            tile = tiles[target]
+            h = token + delta[tile][source * size + target]
+            if action == 'up' or action == 'down':
+                # rows source // cols and target // cols change, at offset col along them
+                sourceLine, targetLine = source // cols, target // cols
+                code, values, conflicts, weight = rowCode, rowValue, rowConflicts, powers[col]
+            else:
+                sourceLine, targetLine = source % cols, target % cols
+                code, values, conflicts, weight = columnCode, columnValue, columnConflicts, powers[row]
+            # In the parent, tile was on source and the blank on target
+            newSource = code(tiles, sourceLine)
+            newTarget = code(tiles, targetLine)
+            oldSource = newSource + (values[sourceLine][tile] - other) * weight
+            oldTarget = newTarget + (other - values[targetLine][tile]) * weight
+            h += 2 * (conflicts[newSource] + conflicts[newTarget] -
+                      conflicts[oldSource] - conflicts[oldTarget])
+            return h, h
+        return update
+
+linearConflict = LinearConflictHeuristic()
+
+
+# Walking distance
+#
+# Looking only at rows, a board is summarised by a matrix whose entry (r, g)
+# counts the tiles in row r whose goal row is g, plus the row of the blank.
+# A vertical move carries one tile into the blank's row. The walking
+# distance of the rows is the fewest such moves to reach the goal matrix;
+# columns are handled the same way with horizontal moves, and the two are
+# added. For lines lines of lineLength cells, a matrix key packs each count
+# into countBits = lineLength.bit_length() bits at bit
+# countBits * (r * lines + g), and the blank's line above them. On the
+# Fifteen Puzzle counts take 3 bits and the blank's row is at bit 48.
+WALKING_DISTANCE_BLANK_SHIFT = 48
+
+_walkingDistanceTables = {}
+
+def walkingDistanceLayout(lines, lineLength):
+    "Returns (countBits, blankShift) of the matrix keys for lines of lineLength cells."
+    countBits = lineLength.bit_length()
+    return countBits, countBits * lines * lines
+
+def walkingDistanceTable(lines=4, lineLength=4):
+    """
+    Returns the dict from matrix key to walking distance, building it by a
+    breadth-first search from the goal matrix the first time it is needed.
+    On square boards the table is the same for rows and for columns; rows
+    x cols boards use walkingDistanceTable(rows, cols) for their rows and
+    walkingDistanceTable(cols, rows) for their columns.
+    """
+    if (lines, lineLength) in _walkingDistanceTables:
+        return _walkingDistanceTables[lines, lineLength]
+    countBits, blankShift = walkingDistanceLayout(lines, lineLength)
+    goal = (lines - 1) << blankShift
+    for line in range(lines):
+        count = lineLength - 1 if line == lines - 1 else lineLength
+        goal |= count << (countBits * (line * lines + line))
+    table = {goal: 0}
+    layer = [goal]
+    depth = 0
+    while layer:
+        depth += 1
+        nextLayer = []
+        for key in layer:
+            blank = key >> blankShift
+            for source in (blank - 1, blank + 1):
+                if not 0 <= source < lines:
+                    continue
+                for g in range(lines):
+                    if (key >> (countBits * (source * lines + g))) & ((1 << countBits) - 1):
+                        moved = (key - (1 << (countBits * (source * lines + g)))
+                                 + (1 << (countBits * (blank * lines + g)))
+                                 + ((source - blank) << blankShift))
+                        if moved not in table:
+                            table[moved] = depth
+                            nextLayer.append(moved)
+        layer = nextLayer
+    _walkingDistanceTables[lines, lineLength] = table
+    return table
+
+class WalkingDistanceHeuristic(IncrementalHeuristic):
+    """
+    Walking distance of the rows plus walking distance of the columns, read
+    from walkingDistanceTable(). Admissible. The token is the pair of row
+    and column matrix keys; a move shifts one count in one of them. An
+    instance works on boards of one size, rows x cols (see forSize); the
+    tables are built on first use. They stay small up to 4x4, but on 5x5
+    boards they outgrow an in-memory dict, so use linear conflict there.
+    """
+
+    def __init__(self, rows=4, cols=4):
+        self.rows, self.cols, self.size = rows, cols, rows * cols
+        self.offsets = blankOffsets(rows, cols)
+        self.rowBits, self.rowBlankShift = walkingDistanceLayout(rows, cols)
+        self.columnBits, self.columnBlankShift = walkingDistanceLayout(cols, rows)
+        self.rowTable = self.columnTable = None
+
+    def initial(self, state):
+        tiles = state.tiles
+        _checkSize(self, tiles, state.cols)
+        if self.rowTable is None:
+            self.rowTable = walkingDistanceTable(self.rows, self.cols)
+            self.columnTable = walkingDistanceTable(self.cols, self.rows)
+        rows, cols = self.rows, self.cols
+        rowKey = columnKey = 0
+        for position, tile in enumerate(tiles):
+            row, col = divmod(position, cols)
+            if tile == 0:
+                rowKey += row << self.rowBlankShift
+                columnKey += col << self.columnBlankShift
+            else:
+                goalRow, goalCol = divmod(tile - 1, cols)
+                rowKey += 1 << (self.rowBits * (row * rows + goalRow))
+                columnKey += 1 << (self.columnBits * (col * cols + goalCol))
+        return self.rowTable[rowKey] + self.columnTable[columnKey], (rowKey, columnKey)
+
+    def update(self, token, action, succState):
+        rowKey, columnKey = token
+        row, col = succState.blankLocation
+        rows, cols = self.rows, self.cols
+        source = row * cols + col
+        target = source - self.offsets[action]
+        tile = succState.tiles[target]
+        if action == 'up' or action == 'down':
+            goal = (tile - 1) // cols
+            sourceRow, targetRow = source // cols, target // cols
+            bits = self.rowBits
+            rowKey += ((1 << (bits * (targetRow * rows + goal))) - (1 << (bits * (sourceRow * rows + goal)))
+                       + ((sourceRow - targetRow) << self.rowBlankShift))
+        else:
+            goal = (tile - 1) % cols
+            sourceCol, targetCol = source % cols, target % cols
+            bits = self.columnBits
+            columnKey += ((1 << (bits * (targetCol * cols + goal))) - (1 << (bits * (sourceCol * cols + goal)))
+                          + ((sourceCol - targetCol) << self.columnBlankShift))
+        return self.rowTable[rowKey] + self.columnTable[columnKey], (rowKey, columnKey)
+
+walkingDistance = WalkingDistanceHeuristic()
+
+
+# Heuristic instances by board size
+_sizedHeuristics = {(name, 4, 4): instance for name, instance in
+                    (('manhattan', manhattan), ('linearConflict', linearConflict),
+                     ('walkingDistance', walkingDistance))}
+_sizedClasses = {'manhattan': ManhattanHeuristic, 'linearConflict': LinearConflictHeuristic,
+                 'walkingDistance': WalkingDistanceHeuristic}
+
+def forSize(name, rows, cols):
+    """
+    Returns the heuristic called name for rows x cols boards: a shared
+    instance of the incremental heuristics built with that size's tables,
+    or the function itself for h1 to h4, which work on any size.
+    """
+    if name not in _sizedClasses:
+        return globals()[name]
+    if (name, rows, cols) not in _sizedHeuristics:
+        _sizedHeuristics[name, rows, cols] = _sizedClasses[name](rows, cols)
+    return _sizedHeuristics[name, rows, cols]
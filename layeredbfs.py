@@ -0,0 +1,198 @@
+# layeredbfs.py
+"""
+Breadth-first enumeration of very large regions of the Fifteen Puzzle
+state space, with each depth layer kept on disk rather than in memory.
+
+States are packed boards (see fifteenpuzzle.packCells). Layer d is written
+to 'layer-<d>.bin' as a sorted array of unsigned 64-bit integers. Layer d+1
+is built by expanding layer d in chunks: each chunk of successors is sorted
+and written as a run file, the runs are merged, duplicates are dropped as
+they meet, and states that appear in layers d or d-1 are removed by
+walking those two sorted files alongside. No hash table of all states is
+ever built, so memory use is bounded by the chunk size.
+
+After every layer a 'progress.json' checkpoint records the per-depth
+counts, and a later call on the same directory resumes from it.
+
+    python layeredbfs.py layers --max-depth 20
+    python layeredbfs.py pattern-layers --pattern 1,2,3,4,5
+"""
+
+import array
+import heapq
+import json
+import os
+
+import fifteenpuzzle
+
+CHECKPOINT = 'progress.json'
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Packed-board nibble shifts of the cells next to each cell
+NEIGHBOR_SHIFTS = [[4 * n for n in (p - 4, p + 4, p - 1 if p % 4 else -1, p + 1 if p % 4 != 3 else -1)
+                    if 0 <= n < 16] for p in range(16)]
+
+def packedSuccessors(board):
+    "Returns the packed boards one move away from the packed board."
+    shift = 0
+    while (board >> shift) & 15:
+        shift += 4
+    children = []
+    for neighborShift in NEIGHBOR_SHIFTS[shift // 4]:
+        number = (board >> neighborShift) & 15
+        children.append(board - (number << neighborShift) + (number << shift))
+    return children
+
+def abstractBoard(board, pattern):
+    """
+    Maps every tile of the packed board that is not in pattern to one
+    shared number, so that boards differing only in those tiles become the
+    same state. Enumerating from the abstracted goal then covers the
+    sub-puzzle space of pattern, as used by pattern databases.
+    """
+    dummy = min(tile for tile in range(1, 16) if tile not in pattern)
+    abstract = 0
+    for shift in range(0, 64, 4):
+        number = (board >> shift) & 15
+        if number and number not in pattern:
+            number = dummy
+        abstract |= number << shift
+    return abstract
+
+def layerPath(directory, depth):
+    return os.path.join(directory, 'layer-%03d.bin' % depth)
+
+def readSorted(path, chunkSize=DEFAULT_CHUNK_SIZE):
+    "Iterates over the integers of a layer or run file, reading chunkSize at a time."
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        while True:
+            chunk = array.array('Q')
+            chunk.frombytes(f.read(8 * chunkSize))
+            if not chunk:
+                return
+            for value in chunk:
+                yield value
+
+def _writeSorted(path, values):
+    "Writes an iterable of increasing integers, through a temporary file."
+    temporary = path + '.tmp'
+    count = 0
+    with open(temporary, 'wb') as out:
+        buffer = array.array('Q')
+        for value in values:
+            buffer.append(value)
+            if len(buffer) >= 65536:
+                buffer.tofile(out)
+                count += len(buffer)
+                buffer = array.array('Q')
+        buffer.tofile(out)
+        count += len(buffer)
+    os.replace(temporary, path)
+    return count
+
+def _without(values, excluded):
+    """
+    Yields the increasing integers of values that do not occur in the
+    increasing iterable excluded.
+    """
+    excluded = iter(excluded)
+    current = next(excluded, None)
+    for value in values:
+        while current is not None and current < value:
+            current = next(excluded, None)
+        if current != value:
+            yield value
+
+def _unique(values):
+    "Drops repeats from an increasing iterable."
+    last = None
+    for value in values:
+        if value != last:
+            yield value
+            last = value
+
+def expandLayer(directory, depth, successors=packedSuccessors, chunkSize=DEFAULT_CHUNK_SIZE):
+    """
+    Builds layer depth + 1 from layers depth and depth - 1 on disk and
+    returns its size.
+    """
+    runs = []
+    buffer = set()
+
+    def flush():
+        path = os.path.join(directory, 'run-%03d-%05d.bin' % (depth + 1, len(runs)))
+        _writeSorted(path, sorted(buffer))
+        runs.append(path)
+        buffer.clear()
+
+    for board in readSorted(layerPath(directory, depth), chunkSize):
+        buffer.update(successors(board))
+        if len(buffer) >= chunkSize:
+            flush()
+    if buffer or not runs:
+        flush()
+
+    merged = _unique(heapq.merge(*[readSorted(run, max(1, chunkSize // len(runs))) for run in runs]))
+    fresh = _without(_without(merged, readSorted(layerPath(directory, depth), chunkSize)),
+                     readSorted(layerPath(directory, depth - 1), chunkSize))
+    count = _writeSorted(layerPath(directory, depth + 1), fresh)
+    for run in runs:
+        os.remove(run)
+    return count
+
+def _saveCheckpoint(directory, start, counts):
+    path = os.path.join(directory, CHECKPOINT)
+    with open(path + '.tmp', 'w') as out:
+        json.dump({'start': start, 'counts': counts}, out)
+    os.replace(path + '.tmp', path)
+
+def layeredBreadthFirstSearch(directory, start=fifteenpuzzle.PACKED_GOAL, successors=packedSuccessors,
+                              maxDepth=None, chunkSize=DEFAULT_CHUNK_SIZE, verbose=False):
+    """
+    Enumerates the states reachable from the packed board start, layer by
+    layer, into directory, until a layer is empty or maxDepth is reached.
+    Resumes from the checkpoint in directory if there is one for the same
+    start. Returns the list of layer sizes by depth.
+
+    chunkSize bounds the number of successors held in memory at once.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    counts = []
+    checkpoint = os.path.join(directory, CHECKPOINT)
+    if os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            saved = json.load(f)
+        if saved['start'] != start:
+            raise ValueError('%s holds a search from a different start state' % directory)
+        counts = saved['counts']
+    if not counts:
+        _writeSorted(layerPath(directory, 0), [start])
+        counts = [1]
+        _saveCheckpoint(directory, start, counts)
+
+    while counts[-1] and (maxDepth is None or len(counts) - 1 < maxDepth):
+        depth = len(counts) - 1
+        counts.append(expandLayer(directory, depth, successors, chunkSize))
+        _saveCheckpoint(directory, start, counts)
+        if verbose:
+            print('depth %3d: %d states' % (depth + 1, counts[-1]))
+    return counts
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Enumerate fifteen puzzle states by depth, on disk.')
+    parser.add_argument('directory', help='where to write the layers and checkpoint')
+    parser.add_argument('--pattern', help='comma separated tiles: enumerate this sub-puzzle only')
+    parser.add_argument('--max-depth', type=int, default=None, help='stop after this depth')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='successors held in memory at once (default: %(default)s)')
+    options = parser.parse_args()
+
+    start = fifteenpuzzle.PACKED_GOAL
+    if options.pattern:
+        start = abstractBoard(start, [int(tile) for tile in options.pattern.split(',')])
+    layeredBreadthFirstSearch(options.directory, start, maxDepth=options.max_depth,
+                              chunkSize=options.chunk_size, verbose=True)
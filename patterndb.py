@@ -0,0 +1,203 @@
+# patterndb.py
+"""
+Additive disjoint pattern database heuristics for the Fifteen Puzzle.
+
+The tiles are split into disjoint groups (a partition). For every group a
+table stores, for each placement of the group's tiles, the fewest moves of
+those tiles needed to bring them home, ignoring all the other tiles. Moves
+of other tiles are free, so the values of the groups can be added and the
+sum is still a lower bound on the real solution length.
+
+Tables are built once by a backwards breadth-first search from the goal
+(buildPatternDatabases, or 'python patterndb.py'), written as raw byte
+files with one byte per placement, and memory-mapped read-only by
+PatternDatabaseHeuristic, so every solver process on a machine shares the
+same copy through the page cache.
+
+The same tables also give a lower bound for the board reflected across the
+main diagonal (see fifteenpuzzle.reflectTiles), which is as far from the
+goal as the board itself; the heuristic takes the larger of the two.
+"""
+
+import mmap
+import os
+
+import fifteenpuzzle
+import util
+
+# Standard partitions of the tiles into disjoint groups
+PARTITIONS = {
+    '663': [(1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)],
+    '555': [(1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)],
+}
+
+DEFAULT_PARTITION = '663'
+DEFAULT_DIRECTORY = 'pdb'
+
+# Cells next to each cell of the 4x4 board
+NEIGHBORS = [[n for n in (p - 4, p + 4, p - 1 if p % 4 else -1, p + 1 if p % 4 != 3 else -1)
+              if 0 <= n < 16] for p in range(16)]
+
+UNSEEN = 255
+
+def patternSize(pattern):
+    "Number of ways to place the tiles of pattern on the board."
+    size = 1
+    for i in range(len(pattern)):
+        size *= 16 - i
+    return size
+
+def rankPositions(positions):
+    """
+    Maps the cells occupied by the tiles of a pattern (in pattern order) to a
+    dense index in range(patternSize(pattern)): each cell is counted among
+    the cells not taken by the tiles before it.
+    """
+    rank = 0
+    used = 0
+    remaining = 16
+    for position in positions:
+        digit = position - bin(used & ((1 << position) - 1)).count('1')
+        rank = rank * remaining + digit
+        remaining -= 1
+        used |= 1 << position
+    return rank
+
+def patternFileName(pattern):
+    return 'pdb-%s.bin' % '-'.join(str(tile) for tile in pattern)
+
+def _blankRegion(start, occupied):
+    """
+    Returns the list of cells the blank can reach from start without moving
+    any of the cells in the bit mask occupied.
+    """
+    region = [start]
+    seen = occupied | (1 << start)
+    for cell in region:
+        for neighbor in NEIGHBORS[cell]:
+            if not seen & (1 << neighbor):
+                seen |= 1 << neighbor
+                region.append(neighbor)
+    return region
+
+def buildPatternDatabase(pattern):
+    """
+    Builds the table for one group of tiles by a breadth-first search
+    backwards from the goal. Abstract states are the cells of the group's
+    tiles together with the region of cells the blank can reach; only moves
+    of the group's tiles cost anything.
+
+    Returns a bytearray indexed by rankPositions.
+    """
+    size = patternSize(pattern)
+    table = bytearray([UNSEEN]) * size
+    # one bit per (placement, blank cell)
+    seen = util.BitSet(size * 16)
+
+    def visit(positions, blank, depth, layer):
+        occupied = 0
+        for position in positions:
+            occupied |= 1 << position
+        rank = rankPositions(positions)
+        if rank * 16 + blank in seen:
+            return
+        for cell in _blankRegion(blank, occupied):
+            seen.add(rank * 16 + cell)
+        if table[rank] == UNSEEN:
+            table[rank] = depth
+        layer.append((positions, blank, occupied))
+
+    layer = []
+    visit(tuple(tile - 1 for tile in pattern), 15, 0, layer)
+    depth = 0
+    while layer:
+        depth += 1
+        nextLayer = []
+        for positions, blank, occupied in layer:
+            for cell in _blankRegion(blank, occupied):
+                for neighbor in NEIGHBORS[cell]:
+                    if not occupied & (1 << neighbor):
+                        continue
+                    # slide the tile on neighbor into the blank on cell
+                    index = positions.index(neighbor)
+                    moved = positions[:index] + (cell,) + positions[index + 1:]
+                    visit(moved, neighbor, depth, nextLayer)
+        layer = nextLayer
+    return table
+
+def buildPatternDatabases(partition=DEFAULT_PARTITION, directory=DEFAULT_DIRECTORY, verbose=False):
+    """
+    Builds and writes the table of every group of partition (a key of
+    PARTITIONS or a list of tile tuples) into directory. Tables that are
+    already on disk are kept.
+    """
+    if isinstance(partition, str):
+        partition = PARTITIONS[partition]
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for pattern in partition:
+        path = os.path.join(directory, patternFileName(pattern))
+        if os.path.exists(path):
+            continue
+        if verbose:
+            print('Building pattern database for tiles %s...' % (pattern,))
+        table = buildPatternDatabase(pattern)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as out:
+            out.write(table)
+        os.replace(temporary, path)
+
+class PatternDatabaseHeuristic:
+    """
+    Additive pattern database heuristic, usable anywhere a
+    heuristic(state, problem) function is expected:
+
+        h = PatternDatabaseHeuristic('pdb', '663')
+        search.aStarSearch(problem, heuristic=h)
+
+    The tables are memory-mapped read-only from directory. If reflect is
+    set, the tables are also looked up for the reflected board and the
+    larger sum is returned.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, partition=DEFAULT_PARTITION, reflect=True):
+        if isinstance(partition, str):
+            partition = PARTITIONS[partition]
+        self.partition = [tuple(pattern) for pattern in partition]
+        self.reflect = reflect
+        # tile of the original board that each pattern tile of the reflected board comes from
+        self.reflectedSources = [[fifteenpuzzle.REFLECTED_TILE[tile] for tile in pattern]
+                                 for pattern in self.partition]
+        self.tables = []
+        for pattern in self.partition:
+            path = os.path.join(directory, patternFileName(pattern))
+            with open(path, 'rb') as f:
+                table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(table) != patternSize(pattern):
+                raise ValueError('%s does not hold a table for tiles %s' % (path, pattern))
+            self.tables.append(table)
+
+    def __call__(self, state, problem=None):
+        where = [0] * 16
+        for position, tile in enumerate(state.tiles):
+            where[tile] = position
+        total = 0
+        for pattern, table in zip(self.partition, self.tables):
+            total += table[rankPositions([where[tile] for tile in pattern])]
+        if not self.reflect:
+            return total
+        reflectedTotal = 0
+        reflectedPosition = fifteenpuzzle.REFLECTED_POSITION
+        for sources, table in zip(self.reflectedSources, self.tables):
+            reflectedTotal += table[rankPositions([reflectedPosition[where[tile]] for tile in sources])]
+        return max(total, reflectedTotal)
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Build Fifteen Puzzle pattern databases.')
+    parser.add_argument('--partition', default=DEFAULT_PARTITION, choices=sorted(PARTITIONS),
+                        help='how to split the tiles into groups (default: %(default)s)')
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY,
+                        help='where to write the tables (default: %(default)s)')
+    options = parser.parse_args()
+    buildPatternDatabases(options.partition, options.directory, verbose=True)
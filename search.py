@@ -16,6 +16,8 @@ In search.py, we implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import heapq
+import time
 import util
 
 class SearchProblem:
@@ -47,6 +49,17 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def getSuccessorsAfter(self, state, lastAction):
+        """
+        state: Search state, reached by lastAction (None for the start state)
+        Like getSuccessors, but problems whose actions can be undone may
+        leave out the successor that undoes lastAction, which is the state's
+        parent, and may return a lazy iterator instead of a list. Searches
+        that know how they reached a state call this instead of
+        getSuccessors; by default it is the same.
+        """
+        return self.getSuccessors(state)
+
     def getCostOfActions(self, actions):
         """
         actions: A list of actions to take
@@ -55,6 +68,157 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def isSolvable(self):
+        """
+        Returns False if the problem is known to have no solution. Problems
+        that can tell cheaply (like the parity test of the Fifteen Puzzle)
+        override this so searches can reject them without exploring the
+        whole reachable state space.
+        """
+        return True
+
+class UnsolvableProblemException(Exception):
+    """Raised by the search functions when problem.isSolvable() is False"""
+    pass
+
+def checkSolvable(problem):
+    "Raises UnsolvableProblemException if problem reports that it has no solution."
+    if not problem.isSolvable():
+        raise UnsolvableProblemException()
+
+class SearchStats:
+    """
+    Counters filled in by a search function that is given one as its stats
+    argument:
+
+        stats = SearchStats()
+        path = aStarSearch(problem, heuristics.manhattan, stats=stats)
+        print(stats.expanded, stats.nodesPerSecond, stats.peakMemory)
+
+    expanded: states whose successors were generated
+    generated: successors generated
+    duplicates: successors dropped because their state was already reached
+      at no greater cost
+    maxFrontier: most entries waiting on the frontier at once
+    maxStored: most states held at once (frontier and reached tables, or
+      the current path for idaStarSearch)
+    heuristicCalls, heuristicTime: evaluations of the heuristic and the
+      seconds spent in them, only counted if timeHeuristic is set: timing
+      every call slows fast heuristics down considerably
+    iterations, thresholds: the cost bounds tried by idaStarSearch, or the
+      weights tried by anytimeAStarSearch
+    suboptimalityBound: set by the weighted searches; with an admissible
+      heuristic the path found costs at most this many times the optimum
+
+    callback(stats) is called every callbackInterval expansions, to report
+    progress or to give up on a search by raising an exception.
+    """
+
+    def __init__(self, callback=None, callbackInterval=10000, bytesPerState=300, timeHeuristic=False):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.maxFrontier = 0
+        self.maxStored = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.iterations = 0
+        self.thresholds = []
+        self.suboptimalityBound = None
+        self.callback = callback
+        self.callbackInterval = callbackInterval
+        self.timeHeuristic = timeHeuristic
+        #rough size of one stored state with its table and frontier entries
+        self.bytesPerState = bytesPerState
+        self.startTime = None
+        self.endTime = None
+
+    def start(self):
+        self.startTime = time.perf_counter()
+        self.endTime = None
+
+    def finish(self, result):
+        "Stops the clock and returns result, so that searches can 'return stats.finish(path)'."
+        self.endTime = time.perf_counter()
+        return result
+
+    def expand(self, frontierSize, stored):
+        "Records the expansion of a state, with the current frontier and stored sizes."
+        self.expanded += 1
+        if frontierSize > self.maxFrontier:
+            self.maxFrontier = frontierSize
+        if stored > self.maxStored:
+            self.maxStored = stored
+        if self.callback is not None and self.expanded % self.callbackInterval == 0:
+            self.callback(self)
+
+    def timed(self, heuristic):
+        "Returns heuristic wrapped so that its calls are counted and timed."
+        return _TimedHeuristic(heuristic, self)
+
+    @property
+    def seconds(self):
+        "Time taken by the search, or so far if it is still running or was interrupted."
+        if self.startTime is None:
+            return 0.0
+        end = self.endTime if self.endTime is not None else time.perf_counter()
+        return end - self.startTime
+
+    @property
+    def nodesPerSecond(self):
+        seconds = self.seconds
+        return self.expanded / seconds if seconds > 0 else None
+
+    @property
+    def peakMemory(self):
+        "Estimated peak memory of the search in bytes."
+        return self.maxStored * self.bytesPerState
+
+    def asDict(self):
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'maxFrontier': self.maxFrontier,
+            'maxStored': self.maxStored,
+            'peakMemory': self.peakMemory,
+            'heuristicCalls': self.heuristicCalls,
+            'heuristicTime': self.heuristicTime,
+            'iterations': self.iterations,
+            'thresholds': self.thresholds,
+            'suboptimalityBound': self.suboptimalityBound,
+            'seconds': self.seconds,
+            'nodesPerSecond': self.nodesPerSecond,
+        }
+
+class _TimedHeuristic:
+    """
+    Counts and times the calls to a heuristic, keeping the initial/update
+    interface of incremental heuristics when it has one.
+    """
+
+    def __init__(self, heuristic, stats):
+        self.heuristic = heuristic
+        self.stats = stats
+        if hasattr(heuristic, 'update'):
+            self.initial = self._timed(heuristic.initial)
+            self.update = self._timed(heuristic.update)
+        self._call = self._timed(heuristic)
+
+    def _timed(self, function):
+        stats = self.stats
+        clock = time.perf_counter
+        def timedFunction(*args):
+            start = clock()
+            result = function(*args)
+            stats.heuristicTime += clock() - start
+            stats.heuristicCalls += 1
+            return result
+        return timedFunction
+
+    def __call__(self, state, problem=None):
+        return self._call(state, problem)
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze. For any other maze, the
@@ -66,8 +230,11 @@ def tinyMazeSearch(problem):
     return [s, s, w, s, w, w, s, w]
 
 
-def depthFirstSearch(problem):
+def depthFirstSearch(problem, stats=None):
     """Search the deepest nodes in the search tree first."""
+    checkSolvable(problem)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
 
     # define start node
     frontier = [(problem.getStartState(), [])]
@@ -79,90 +246,128 @@ def depthFirstSearch(problem):
         state, actions = frontier.pop()
 
         if problem.isGoalState(state):
-            return actions, expanded_nodes_count
+            return stats.finish((actions, expanded_nodes_count))
 
         if state not in explored:
             expanded_nodes_count += 1  # Increment the expanded nodes count
             explored.add(state)
+            stats.expand(len(frontier), len(frontier) + len(explored))
             successors = problem.getSuccessors(state)
 
             for next_state, action, _ in successors:
+                stats.generated += 1
                 if next_state not in repeated_states:  # Check for repeated states
                     frontier.append((next_state, actions + [action]))
                 else:
+                    stats.duplicates += 1
                     #===== Start Change Task 4 =====*/
-                    return None, expanded_nodes_count  # No solution found due to infinite loop
+                    return stats.finish((None, expanded_nodes_count))  # No solution found due to infinite loop
                     #===== End Change Task 4 =====*/
                 repeated_states.add(next_state)
                 
     #===== Start Change Task 4 =====*/
-    return [], expanded_nodes_count  # No solution found
+    return stats.finish(([], expanded_nodes_count))  # No solution found
     #===== End Change Task 4 =====*/
 
 
-def breadthFirstSearch(problem):
-    """Search the shallowest nodes in the search tree first."""
-    #to be explored (FIFO)
-    frontier = util.Queue()
-    #previously expanded states (for cycle checking), holds states
-    exploredNodes = []
-
-    startState = problem.getStartState()
-    startNode = (startState, [], 0) #(state, action, cost)
-    frontier.push(startNode)
+def reconstructPath(parents, state):
+    """
+    parents: dict mapping every reached state to (parentState, action), and
+    the start state to None.
+    Returns the list of actions leading from the start state to state.
+    """
+    actions = []
+    while parents[state] is not None:
+        state, action = parents[state]
+        actions.append(action)
+    actions.reverse()
+    return actions
 
-    while not frontier.isEmpty():
-        #begin exploring first (earliest-pushed) node on frontier
-        currentState, actions, currentCost = frontier.pop()
+def lastActionOf(parents, state):
+    "The action that reached state in a dict like reconstructPath's, or None for the start state."
+    parent = parents[state]
+    return parent[1] if parent is not None else None
 
-        if currentState not in exploredNodes:
-            #put popped node state into explored list
-            exploredNodes.append(currentState)
+def breadthFirstSearch(problem, stats=None):
+    """
+    Search the shallowest nodes in the search tree first.
 
-            if problem.isGoalState(currentState):
-                return actions
-            else:
-                #list of (successor, action, stepCost)
-                successors = problem.getSuccessors(currentState)
+    Duplicates and goals are checked when a state is generated rather than
+    when it is popped, so every state enters the frontier at most once.
+    """
+    checkSolvable(problem)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    #to be explored (FIFO), holds states
+    frontier = util.Queue()
+    #every state generated so far (for cycle checking), holds state:(parentState, action)
+    reached = {}
 
-                for succState, succAction, succCost in successors:
-                    newAction = actions + [succAction]
-                    newCost = currentCost + succCost
-                    newNode = (succState, newAction, newCost)
-                    frontier.push(newNode)
-    return actions
+    startState = problem.getStartState()
+    reached[startState] = None
+    if problem.isGoalState(startState):
+        return stats.finish([])
+    frontier.push(startState)
 
-def uniformCostSearch(problem):
+    while not frontier.isEmpty():
+        #begin exploring first (earliest-pushed) state on frontier
+        currentState = frontier.pop()
+        stats.expand(len(frontier) + 1, len(reached))
+
+        #list of (successor, action, stepCost)
+        for succState, succAction, succCost in problem.getSuccessorsAfter(
+                currentState, lastActionOf(reached, currentState)):
+            stats.generated += 1
+            if succState in reached:
+                stats.duplicates += 1
+                continue
+            reached[succState] = (currentState, succAction)
+            if problem.isGoalState(succState):
+                return stats.finish(reconstructPath(reached, succState))
+            frontier.push(succState)
+    return stats.finish([])
+
+def uniformCostSearch(problem, stats=None):
     """Search the node of least total cost first."""
-    #to be explored (FIFO): holds (item, cost)
-    frontier = util.PriorityQueue()
+    checkSolvable(problem)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    #to be explored: holds (item, cost), at most one item per state
+    frontier = util.IndexedPriorityQueue(key=lambda node: node[0])
     #previously expanded states (for cycle checking), holds state:cost
     exploredNodes = {}
+    #how each expanded state was reached, holds state:(parentState, action)
+    parents = {}
 
     startState = problem.getStartState()
-    startNode = (startState, [], 0) #(state, action, cost)
+    startNode = (startState, None, None, 0) #(state, parentState, action, cost)
     frontier.push(startNode, 0)
 
     while not frontier.isEmpty():
         #begin exploring first (lowest-cost) node on frontier
-        currentState, actions, currentCost = frontier.pop()
+        currentState, parentState, action, currentCost = frontier.pop()
 
         if (currentState not in exploredNodes) or (currentCost < exploredNodes[currentState]):
             #put popped node's state into explored list
             exploredNodes[currentState] = currentCost
+            parents[currentState] = (parentState, action) if parentState is not None else None
 
             if problem.isGoalState(currentState):
-                return actions
+                return stats.finish(reconstructPath(parents, currentState))
             else:
+                stats.expand(len(frontier) + 1, len(frontier) + len(exploredNodes))
                 #list of (successor, action, stepCost)
-                successors = problem.getSuccessors(currentState)
+                successors = problem.getSuccessorsAfter(currentState, action)
 
                 for succState, succAction, succCost in successors:
-                    newAction = actions + [succAction]
+                    stats.generated += 1
                     newCost = currentCost + succCost
-                    newNode = (succState, newAction, newCost)
+                    if succState in exploredNodes and newCost >= exploredNodes[succState]:
+                        stats.duplicates += 1
+                        continue
+                    newNode = (succState, currentState, succAction, newCost)
                     frontier.update(newNode, newCost)
-    return actions
+    return stats.finish([])
 
 def nullHeuristic(state, problem=None):
     """
@@ -171,55 +376,436 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    #to be explored (FIFO): takes in item, cost+heuristic
-    frontier = util.PriorityQueue()
-    exploredNodes = [] #holds (state, cost)
+def aStarSearch(problem, heuristic=nullHeuristic, bucketQueue=False, stats=None, weight=1):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    If heuristic is a heuristics.IncrementalHeuristic, the value of each
+    successor is updated from its parent's instead of being recomputed.
+
+    bucketQueue: use a util.BucketPriorityQueue, which breaks ties on
+    cost+heuristic towards the deepest node. Needs integer step costs and
+    heuristic values.
+
+    weight: weighted A*, which orders the frontier by cost+weight*heuristic.
+    Larger weights expand far fewer nodes, and with an admissible heuristic
+    the path costs at most weight times the optimum (stats.suboptimalityBound).
+    With bucketQueue the weight must be an integer.
+    """
+    checkSolvable(problem)
+    if stats is not None and stats.timeHeuristic:
+        heuristic = stats.timed(heuristic)
+    stats = stats if stats is not None else SearchStats()
+    stats.suboptimalityBound = weight
+    stats.start()
+    incremental = hasattr(heuristic, 'update')
+    #to be explored: takes in item, cost+heuristic
+    if bucketQueue:
+        frontier = util.BucketPriorityQueue(depth=lambda node: node[1])
+    else:
+        frontier = util.PriorityQueue()
+    #best known cost for every generated state, holds state:cost
+    bestCost = {}
+    #how the best known path reaches each state, holds state:(parentState, action)
+    parents = {}
 
     startState = problem.getStartState()
-    startNode = (startState, [], 0) #(state, action, cost)
-    frontier.push(startNode, 0)
+    if incremental:
+        startHeuristic, startToken = heuristic.initial(startState)
+    else:
+        startHeuristic, startToken = heuristic(startState, problem), None
+    startNode = (startState, 0, startToken) #(state, cost, heuristic token)
+    frontier.push(startNode, weight * startHeuristic)
+    bestCost[startState] = 0
+    parents[startState] = None
 
     while not frontier.isEmpty():
         #begin exploring first (lowest-combined (cost+heuristic) ) node on frontier
-        currentState, actions, currentCost = frontier.pop()
+        currentState, currentCost, currentToken = frontier.pop()
 
-        #put popped node into explored list
-        currentNode = (currentState, currentCost)
-        exploredNodes.append((currentState, currentCost))
+        #lazy deletion: a cheaper copy of this state was pushed after this one
+        if currentCost > bestCost[currentState]:
+            continue
 
         if problem.isGoalState(currentState):
-            return actions
+            return stats.finish(reconstructPath(parents, currentState))
+        stats.expand(len(frontier) + 1, len(frontier) + len(bestCost))
+
+        #list of (successor, action, stepCost)
+        for succState, succAction, succCost in problem.getSuccessorsAfter(
+                currentState, lastActionOf(parents, currentState)):
+            stats.generated += 1
+            newCost = currentCost + succCost
+
+            #only keep this successor if it improves on every copy seen so far
+            if succState in bestCost and newCost >= bestCost[succState]:
+                stats.duplicates += 1
+                continue
+            bestCost[succState] = newCost
+            parents[succState] = (currentState, succAction)
+            if incremental:
+                succHeuristic, succToken = heuristic.update(currentToken, succAction, succState)
+            else:
+                succHeuristic, succToken = heuristic(succState, problem), None
+            newNode = (succState, newCost, succToken)
+            frontier.push(newNode, newCost + weight * succHeuristic)
+    return stats.finish([])
 
+def anytimeAStarSearch(problem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5, timeLimit=None,
+                       onSolution=None, stats=None):
+    """
+    Anytime Repairing A* (ARA*): a weighted A* with a large weight finds a
+    first path quickly, then the weight is lowered by weightStep and the
+    search goes on from where it stopped to find better paths, until the
+    weight reaches 1 (the last path is then optimal) or timeLimit seconds
+    have passed. Only states whose cost improved since they were expanded
+    are expanded again, so the work of earlier iterations is reused.
+
+    Returns the best path found. After every path, stats.suboptimalityBound
+    is set to the proven bound: the path costs at most this many times the
+    optimum, given an admissible heuristic. onSolution(path, bound), if
+    given, is called with each cheaper path as it is found, including one
+    found in an iteration cut short by the time limit.
+
+    The time limit is only checked once a first path exists.
+    """
+    checkSolvable(problem)
+    if stats is not None and stats.timeHeuristic:
+        heuristic = stats.timed(heuristic)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    deadline = None if timeLimit is None else time.perf_counter() + timeLimit
+
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        stats.suboptimalityBound = 1.0
+        return stats.finish([])
+
+    #best known cost, heuristic and parent of every generated state
+    bestCost = {startState: 0}
+    heuristicValues = {startState: heuristic(startState, problem)}
+    parents = {startState: None}
+    #heap of (cost+weight*heuristic, tie breaker, state, cost)
+    frontier = [(weight * heuristicValues[startState], 0, startState, 0)]
+    pushed = 1
+    #states expanded in this iteration, and those among them whose cost improved since
+    closed = set()
+    inconsistent = set()
+    goalState, goalCost = None, float('inf')
+    path, pathCost = None, float('inf')
+
+    while True:
+        #expand until no frontier entry can lead to a cheaper goal under the current weight
+        interrupted = False
+        while frontier:
+            priority, _, state, cost = frontier[0]
+            if cost > bestCost[state] or state in closed:
+                heapq.heappop(frontier)
+                continue
+            if goalCost <= priority:
+                break
+            if path is not None and deadline is not None and time.perf_counter() > deadline:
+                interrupted = True
+                break
+            heapq.heappop(frontier)
+            closed.add(state)
+            stats.expand(len(frontier) + 1, len(bestCost) + len(frontier))
+            for succState, succAction, succCost in problem.getSuccessorsAfter(
+                    state, lastActionOf(parents, state)):
+                stats.generated += 1
+                newCost = cost + succCost
+                if succState in bestCost and newCost >= bestCost[succState]:
+                    stats.duplicates += 1
+                    continue
+                bestCost[succState] = newCost
+                parents[succState] = (state, succAction)
+                if succState not in heuristicValues:
+                    heuristicValues[succState] = heuristic(succState, problem)
+                if problem.isGoalState(succState):
+                    goalState, goalCost = succState, newCost
+                if succState in closed:
+                    inconsistent.add(succState)
+                else:
+                    succPriority = newCost + weight * heuristicValues[succState]
+                    heapq.heappush(frontier, (succPriority, pushed, succState, newCost))
+                    pushed += 1
+        if interrupted:
+            #keep a cheaper goal found before the deadline; its bound is the last one proven
+            if goalCost < pathCost:
+                path, pathCost = reconstructPath(parents, goalState), goalCost
+                if onSolution is not None:
+                    onSolution(path, stats.suboptimalityBound)
+            break
+        if goalState is None:
+            break
+
+        #every cheaper path goes through a state still open or inconsistent
+        openStates = set(entry[2] for entry in frontier
+                         if entry[3] == bestCost[entry[2]] and entry[2] not in closed)
+        openStates |= inconsistent
+        lowerBound = min([bestCost[state] + heuristicValues[state] for state in openStates] or [goalCost])
+        bound = min(weight, goalCost / lowerBound) if lowerBound > 0 else weight
+        stats.iterations += 1
+        stats.thresholds.append(weight)
+        stats.suboptimalityBound = max(1.0, bound)
+        if goalCost < pathCost:
+            path, pathCost = reconstructPath(parents, goalState), goalCost
+            if onSolution is not None:
+                onSolution(path, stats.suboptimalityBound)
+        if stats.suboptimalityBound <= 1 or (deadline is not None and time.perf_counter() > deadline):
+            break
+
+        weight = max(1.0, weight - weightStep)
+        frontier = []
+        for state in openStates:
+            frontier.append((bestCost[state] + weight * heuristicValues[state], pushed, state, bestCost[state]))
+            pushed += 1
+        heapq.heapify(frontier)
+        closed = set()
+        inconsistent = set()
+    return stats.finish(path or [])
+
+def idaStarSearch(problem, heuristic=nullHeuristic, stats=None, pruner=None):
+    """
+    Iterative-deepening A*: repeated depth-first searches bounded by a
+    threshold on cost+heuristic, raised to the smallest value that exceeded
+    it after each iteration. Only the current path is kept in memory.
+
+    The search runs on a single mutable board from problem.getStartBoard(),
+    which must provide legalMoves(), apply(move) and undo(move); every move
+    costs 1. The move that undoes the previous one, given by
+    problem.getInverseAction, is never tried.
+
+    pruner: a move pruning state machine such as fifteenpuzzle.movePruner(),
+    with a start state and transitions[state] mapping each allowed move to
+    the next state. Moves it leaves out are skipped instead of just the
+    inverse of the previous move.
+
+    stats.iterations and stats.thresholds record the cost bounds tried;
+    the other counters add up over all iterations.
+    """
+    checkSolvable(problem)
+    if stats is not None and stats.timeHeuristic:
+        heuristic = stats.timed(heuristic)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    incremental = hasattr(heuristic, 'update')
+    board = problem.getStartBoard()
+    path = []
+    FOUND = -1
+
+    transitions = pruner.transitions if pruner is not None else None
+
+    def boundedSearch(cost, h, token, threshold, lastAction, pruneState):
+        f = cost + h
+        if f > threshold:
+            return f
+        if problem.isGoalState(board):
+            return FOUND
+        stats.expand(len(path), len(path) + 1)
+        if transitions is not None:
+            allowed = transitions[pruneState]
         else:
-            #list of (successor, action, stepCost)
-            successors = problem.getSuccessors(currentState)
-
-            #examine each successor
-            for succState, succAction, succCost in successors:
-                newAction = actions + [succAction]
-                newCost = problem.getCostOfActions(newAction)
-                newNode = (succState, newAction, newCost)
-
-                #check if this successor has been explored
-                already_explored = False
-                for explored in exploredNodes:
-                    #examine each explored node tuple
-                    exploredState, exploredCost = explored
-                    if (succState == exploredState) and (newCost >= exploredCost):
-                        already_explored = True
-
-                #if this successor not explored, put on frontier and explored list
-                if not already_explored:
-                    #start task
-                    frontier.push(newNode, newCost + heuristic(succState))
-                    #end task
-                    exploredNodes.append((succState, newCost))
+            inverse = problem.getInverseAction(lastAction) if lastAction else None
+        smallest = float('inf')
+        for action in board.legalMoves():
+            if transitions is not None:
+                nextPruneState = allowed.get(action)
+                if nextPruneState is None:
+                    continue
+            elif action == inverse:
+                continue
+            else:
+                nextPruneState = None
+            stats.generated += 1
+            board.apply(action)
+            path.append(action)
+            if incremental:
+                succH, succToken = heuristic.update(token, action, board)
+            else:
+                succH, succToken = heuristic(board, problem), None
+            t = boundedSearch(cost + 1, succH, succToken, threshold, action, nextPruneState)
+            if t == FOUND:
+                return FOUND
+            path.pop()
+            board.undo(action)
+            if t < smallest:
+                smallest = t
+        return smallest
+
+    if incremental:
+        startH, startToken = heuristic.initial(board)
+    else:
+        startH, startToken = heuristic(board, problem), None
+    threshold = startH
+    while True:
+        stats.iterations += 1
+        stats.thresholds.append(threshold)
+        t = boundedSearch(0, startH, startToken, threshold, None,
+                          pruner.start if pruner is not None else None)
+        if t == FOUND or t == float('inf'):
+            break
+        threshold = t
+    return stats.finish(path)
+
+def _joinPaths(problem, forwardParents, backwardParents, meetingState):
+    """
+    Returns the actions from the start state to meetingState, followed by
+    the actions from meetingState to the goal. backwardParents maps each
+    state reached from the goal to (stateNearerTheGoal, action), where
+    action leads from stateNearerTheGoal to the state, so it is inverted.
+    """
+    actions = reconstructPath(forwardParents, meetingState)
+    state = meetingState
+    while backwardParents[state] is not None:
+        state, action = backwardParents[state]
+        actions.append(problem.getInverseAction(action))
     return actions
 
+def bidirectionalBreadthFirstSearch(problem, stats=None):
+    """
+    Breadth-first search from the start state and from the goal state at
+    once, always growing the smaller of the two frontiers by a whole layer.
+    Returns a shortest path when the two searches meet.
+
+    Needs unit step costs, reversible actions and a problem that provides
+    getGoalState() and getInverseAction(action).
+    """
+    checkSolvable(problem)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return stats.finish([])
+    goalState = problem.getGoalState()
+
+    #holds state:(parentState, action) and state:depth for each direction
+    parents = ({startState: None}, {goalState: None})
+    depths = ({startState: 0}, {goalState: 0})
+    layers = ([startState], [goalState])
+
+    while layers[0] and layers[1]:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        ownParents, ownDepths = parents[side], depths[side]
+        otherDepths = depths[1 - side]
+        best, meetingState = None, None
+        nextLayer = []
+        for state in layers[side]:
+            depth = ownDepths[state] + 1
+            stats.expand(len(layers[0]) + len(layers[1]) + len(nextLayer),
+                         len(parents[0]) + len(parents[1]))
+            for succState, succAction, succCost in problem.getSuccessorsAfter(
+                    state, lastActionOf(ownParents, state)):
+                stats.generated += 1
+                if succState in ownParents:
+                    stats.duplicates += 1
+                    continue
+                ownParents[succState] = (state, succAction)
+                ownDepths[succState] = depth
+                nextLayer.append(succState)
+                if succState in otherDepths:
+                    length = depth + otherDepths[succState]
+                    if best is None or length < best:
+                        best, meetingState = length, succState
+        #the whole layer is expanded before stopping, so the meeting found is the closest one
+        if meetingState is not None:
+            return stats.finish(_joinPaths(problem, parents[0], parents[1], meetingState))
+        layers = (nextLayer, layers[1]) if side == 0 else (layers[0], nextLayer)
+    return stats.finish([])
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic, backwardHeuristic=nullHeuristic,
+                             stats=None):
+    """
+    A* from the start state towards the goal and from the goal state
+    towards the start at once, expanding from the side with the smaller
+    frontier. Every state reached from both sides gives a path; the search
+    stops once the best of them costs no more than a lower bound on any
+    path not found yet: the larger of the smallest cost+heuristic on each
+    frontier, or the sum of the smallest costs on both frontiers plus one
+    step. This proves the path optimal when both heuristics are admissible
+    and every step costs at least 1.
+
+    heuristic estimates the cost to the goal, backwardHeuristic the cost
+    to the start state (see heuristics.manhattanTo). Needs reversible
+    actions and a problem that provides getGoalState() and
+    getInverseAction(action).
+    """
+    checkSolvable(problem)
+    if stats is not None and stats.timeHeuristic:
+        heuristic = stats.timed(heuristic)
+        backwardHeuristic = stats.timed(backwardHeuristic)
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return stats.finish([])
+    goalState = problem.getGoalState()
+
+    heuristicFunctions = (heuristic, backwardHeuristic)
+    #holds state:cost and state:(parentState, action) for each direction
+    bestCost = ({startState: 0}, {goalState: 0})
+    parents = ({startState: None}, {goalState: None})
+    #heaps of (cost+heuristic, tie breaker, state, cost)
+    frontiers = ([(heuristic(startState, problem), 0, startState, 0)],
+                 [(backwardHeuristic(goalState, problem), 0, goalState, 0)])
+    pushed = 1
+    #number of frontier entries with each cost, holds cost:count (stale entries included,
+    #which can only lower the smallest cost and so keeps the bound valid)
+    costCounts = ({0: 1}, {0: 1})
+
+    def popEntry(side):
+        entry = heapq.heappop(frontiers[side])
+        counts = costCounts[side]
+        counts[entry[3]] -= 1
+        if not counts[entry[3]]:
+            del counts[entry[3]]
+        return entry
+
+    bestLength, meetingState = float('inf'), None
+    while True:
+        #lazy deletion: drop entries for which a cheaper path was found since
+        for side in (0, 1):
+            frontier = frontiers[side]
+            while frontier and frontier[0][3] > bestCost[side][frontier[0][2]]:
+                popEntry(side)
+        if not frontiers[0] or not frontiers[1]:
+            break
+        lowerBound = max(frontiers[0][0][0], frontiers[1][0][0],
+                         min(costCounts[0]) + min(costCounts[1]) + 1)
+        if bestLength <= lowerBound:
+            break
+
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        ownCost, otherCost = bestCost[side], bestCost[1 - side]
+        _, _, state, cost = popEntry(side)
+        stats.expand(len(frontiers[0]) + len(frontiers[1]) + 1,
+                     len(frontiers[0]) + len(frontiers[1]) + len(bestCost[0]) + len(bestCost[1]))
+        for succState, succAction, succCost in problem.getSuccessorsAfter(
+                state, lastActionOf(parents[side], state)):
+            stats.generated += 1
+            newCost = cost + succCost
+            if succState in ownCost and newCost >= ownCost[succState]:
+                stats.duplicates += 1
+                continue
+            ownCost[succState] = newCost
+            parents[side][succState] = (state, succAction)
+            if succState in otherCost and newCost + otherCost[succState] < bestLength:
+                bestLength, meetingState = newCost + otherCost[succState], succState
+            priority = newCost + heuristicFunctions[side](succState, problem)
+            heapq.heappush(frontiers[side], (priority, pushed, succState, newCost))
+            costCounts[side][newCost] = costCounts[side].get(newCost, 0) + 1
+            pushed += 1
+
+    if meetingState is None:
+        return stats.finish([])
+    return stats.finish(_joinPaths(problem, parents[0], parents[1], meetingState))
+
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
-ucs = uniformCostSearch
\ No newline at end of file
+arastar = anytimeAStarSearch
+ucs = uniformCostSearch
+idastar = idaStarSearch
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
\ No newline at end of file
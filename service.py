@@ -0,0 +1,265 @@
+# service.py
+"""
+A non-interactive solver service: reads puzzles as lines, solves them on a
+pool of worker processes and writes one JSON line per puzzle as soon as it
+is solved.
+
+    python service.py < puzzles.txt > results.jsonl
+    python service.py --unix /tmp/fifteen.sock
+    python service.py --tcp 127.0.0.1:8015
+
+Each input line is either 16 numbers separated by spaces or commas, a JSON
+list of 16 numbers, or a JSON object
+
+    {"id": "a1", "puzzle": [...], "algorithm": "idastar", "heuristic": "linearConflict", "timeout": 5}
+
+where everything but "puzzle" is optional and defaults to the options the
+service was started with. The output is the result dict of
+batch.solvePuzzle (status, path, seconds, search stats with the node
+counts), plus the request's "id" if it had one and the "latency" in
+seconds from reading the line to writing the result. Results come in the
+order puzzles are solved; 'index' is the line's number in its stream.
+Lines that cannot be read get a result with status 'error'.
+
+At most queueSize puzzles are being solved or waiting for a worker at any
+time, shared by every client, and at most streamQueueSize of them (default:
+half the queue) from one client, counting its results not written yet.
+Reading stops while the queue is full, so a producer that writes faster
+than the workers solve is slowed down by its pipe or socket filling up,
+instead of the service buffering everything. Each client's results are
+written by its own thread, so a client that does not read only stalls
+itself.
+"""
+
+import concurrent.futures
+import concurrent.futures.process
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+
+import batch
+
+def parseRequest(line, algorithm, heuristic, timeout):
+    """
+    Parses one input line into a dict with the puzzle's 'numbers', its
+    'id' (None if not given) and the 'algorithm', 'heuristic' and
+    'timeout' to solve it with. Raises ValueError for malformed lines.
+    """
+    line = line.strip()
+    request = {'id': None, 'algorithm': algorithm, 'heuristic': heuristic, 'timeout': timeout}
+    if line.startswith('{') or line.startswith('['):
+        data = json.loads(line)
+        if isinstance(data, dict):
+            for key in ('id', 'algorithm', 'heuristic', 'timeout'):
+                if key in data:
+                    request[key] = data[key]
+            data = data.get('puzzle')
+        numbers = data
+    else:
+        numbers = line.replace(',', ' ').split()
+    try:
+        numbers = [int(number) for number in numbers]
+    except (TypeError, ValueError):
+        raise ValueError('Not a fifteen puzzle: %s' % line)
+    if sorted(numbers) != list(range(16)):
+        raise ValueError('Not a fifteen puzzle: %s' % line)
+    batch.checkOptions(request['algorithm'], request['heuristic'], request['timeout'])
+    request['numbers'] = numbers
+    return request
+
+class SolverService:
+    """
+    Solves the puzzles of any number of line streams on one shared
+    ProcessPoolExecutor of workers processes (default: one per CPU), with
+    at most queueSize puzzles (default: four per worker) in flight, and at
+    most streamQueueSize (default: half of queueSize) per stream.
+
+    algorithm, heuristic, timeout and cachePath are the defaults passed to
+    batch.solvePuzzle for requests that do not name their own.
+    """
+
+    def __init__(self, workers=None, queueSize=None, algorithm='astar', heuristic='manhattan',
+                 timeout=None, cachePath=None, streamQueueSize=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        self.poolLock = threading.Lock()
+        queueSize = queueSize or self.workers * 4
+        self.slots = threading.BoundedSemaphore(queueSize)
+        self.streamQueueSize = streamQueueSize or max(1, queueSize // 2)
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.timeout = timeout
+        self.cachePath = cachePath
+
+    def serve(self, lines, write):
+        """
+        Solves the puzzle on every line of the iterable lines, calling
+        write(text) with each result's JSON line from a writer thread of
+        this stream. Returns once every result has been written, or once
+        write has failed (say the client went away): reading then stops and
+        the remaining results are dropped.
+
+        A stream has at most streamQueueSize puzzles solved or waiting to be
+        written at a time, so a client that stops reading its results only
+        holds up itself.
+        """
+        outbox = queue.Queue()
+        streamSlots = threading.BoundedSemaphore(self.streamQueueSize)
+        broken = threading.Event()
+        done = threading.Condition()
+        outstanding = [0]
+
+        def writer():
+            while True:
+                text, holdsSlot = outbox.get()
+                if text is None:
+                    return
+                if text and not broken.is_set():
+                    try:
+                        write(text)
+                    except (OSError, ValueError):
+                        broken.set()
+                if holdsSlot:
+                    streamSlots.release()
+
+        def finished(future, request, received):
+            self.slots.release()
+            text = ''
+            try:
+                try:
+                    result = future.result()
+                except Exception as exception:
+                    result = batch.errorResult(request['index'], request['numbers'], exception)
+                if request['id'] is not None:
+                    result['id'] = request['id']
+                result['latency'] = time.time() - received
+                text = json.dumps(result) + '\n'
+            finally:
+                outbox.put((text, True))
+                with done:
+                    outstanding[0] -= 1
+                    done.notify_all()
+
+        writerThread = threading.Thread(target=writer)
+        writerThread.daemon = True
+        writerThread.start()
+        for index, line in enumerate(lines):
+            if broken.is_set():
+                break
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            received = time.time()
+            try:
+                request = parseRequest(line, self.algorithm, self.heuristic, self.timeout)
+            except ValueError as exception:
+                outbox.put((json.dumps({'index': index, 'status': 'error', 'error': str(exception)}) + '\n',
+                            False))
+                continue
+            request['index'] = index
+            streamSlots.acquire()
+            self.slots.acquire()
+            try:
+                future = self._submit(batch.solvePuzzle, index, request['numbers'], request['algorithm'],
+                                      request['heuristic'], request['timeout'], self.cachePath)
+            except Exception as exception:
+                self.slots.release()
+                outbox.put((json.dumps(batch.errorResult(index, request['numbers'], exception)) + '\n', True))
+                continue
+            with done:
+                outstanding[0] += 1
+            future.add_done_callback(lambda future, request=request, received=received:
+                                     finished(future, request, received))
+        with done:
+            while outstanding[0]:
+                done.wait()
+        outbox.put((None, False))
+        writerThread.join()
+
+    def _submit(self, function, *args):
+        """
+        Submits function(*args) to the pool. A pool broken by a worker that
+        died is replaced by a new one, once.
+        """
+        with self.poolLock:
+            try:
+                return self.pool.submit(function, *args)
+            except concurrent.futures.process.BrokenProcessPool:
+                self.pool.shutdown(wait=False)
+                self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+                return self.pool.submit(function, *args)
+
+    def close(self):
+        self.pool.shutdown()
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    "Serves the lines of one connection; self.server.service is the SolverService."
+
+    def handle(self):
+        lines = (line.decode('utf-8', 'replace') for line in self.rfile)
+
+        def write(text):
+            self.wfile.write(text.encode('utf-8'))
+            self.wfile.flush()
+        self.server.service.serve(lines, write)
+
+def makeServer(service, tcp=None, unix=None):
+    """
+    Returns a threaded socketserver that serves each connection's lines with
+    service: on tcp, a (host, port) pair, or on the Unix socket path unix.
+    """
+    if unix is not None:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        server = socketserver.ThreadingUnixStreamServer(unix, _LineHandler)
+    else:
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer(tcp, _LineHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Solve fifteen puzzles read as lines; results are written as JSON lines.')
+    listen = parser.add_mutually_exclusive_group()
+    listen.add_argument('--tcp', default=None, metavar='HOST:PORT', help='serve a TCP socket')
+    listen.add_argument('--unix', default=None, metavar='PATH', help='serve a Unix socket')
+    parser.add_argument('--algorithm', default='astar', help='search function (default: %(default)s)')
+    parser.add_argument('--heuristic', default='manhattan', help='heuristic name (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPUs)')
+    parser.add_argument('--queue', type=int, default=None,
+                        help='puzzles in flight at most (default: 4 per worker)')
+    parser.add_argument('--stream-queue', dest='streamQueue', type=int, default=None,
+                        help='puzzles in flight at most per client (default: half of --queue)')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds allowed per puzzle')
+    parser.add_argument('--cache', default=None, help='sqlite file to look up and store solutions in')
+    options = parser.parse_args()
+    try:
+        batch.checkOptions(options.algorithm, options.heuristic, options.timeout)
+    except ValueError as exception:
+        parser.error(str(exception))
+
+    service = SolverService(options.workers, options.queue, options.algorithm, options.heuristic,
+                            options.timeout, options.cache, options.streamQueue)
+    try:
+        if options.tcp is None and options.unix is None:
+            service.serve(sys.stdin, lambda text: (sys.stdout.write(text), sys.stdout.flush()))
+        else:
+            tcp = None
+            if options.tcp is not None:
+                host, _, port = options.tcp.rpartition(':')
+                tcp = (host or '127.0.0.1', int(port))
+            server = makeServer(service, tcp, options.unix)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+    finally:
+        service.close()
@@ -0,0 +1,58 @@
+# test_batch.py
+import os
+import signal
+import time
+import unittest
+from unittest import mock
+
+import batch
+import search
+import util
+
+SOLVABLE = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 0, 15]
+UNSOLVABLE = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15, 14, 0]
+
+def _failingSolve(index, numbers, *args):
+    "Stands in for batch.solvePuzzle in the workers: puzzle 1 raises, puzzle 2 kills its worker."
+    if index == 1:
+        raise MemoryError()
+    if index == 2:
+        os._exit(1)
+    return {'index': index, 'status': 'solved'}
+
+class TimeoutTest(unittest.TestCase):
+
+    def testAlarmCancelledAfterException(self):
+        def unsolvable():
+            raise search.UnsolvableProblemException()
+        with self.assertRaises(search.UnsolvableProblemException):
+            util.TimeoutFunction(unsolvable, 5)()
+        self.assertEqual(signal.alarm(0), 0)
+
+    def testWorkerSurvivesUnsolvablePuzzleWithTimeout(self):
+        def puzzles():
+            yield UNSOLVABLE
+            time.sleep(1.5)  # longer than the timeout, with the worker idle
+            yield SOLVABLE
+        results = sorted(batch.solveBatch(puzzles(), workers=1, timeout=1),
+                         key=lambda result: result['index'])
+        self.assertEqual([result['status'] for result in results], ['unsolvable', 'solved'])
+        self.assertEqual(results[1]['path'], ['right'])
+
+class SolveBatchTest(unittest.TestCase):
+
+    def testFailuresBecomeErrorResults(self):
+        def puzzles():
+            yield SOLVABLE
+            yield SOLVABLE
+            time.sleep(0.5)  # let puzzle 1 fail on its own before puzzle 2 breaks the pool
+            yield SOLVABLE
+            time.sleep(0.5)
+            yield SOLVABLE
+        with mock.patch.object(batch, 'solvePuzzle', _failingSolve):
+            results = sorted(batch.solveBatch(puzzles(), workers=1), key=lambda result: result['index'])
+        self.assertEqual([result['status'] for result in results], ['solved', 'error', 'error', 'solved'])
+        self.assertIn('MemoryError', results[1]['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@
 import sys
 import inspect
 import heapq, random
+import collections
 from io import StringIO
 
 class FixedRandom:
@@ -133,26 +134,57 @@ class Stack:
         "Returns true if the stack is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
-        self.list = []
+        self.list = collections.deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
+class BitSet:
+    """
+      A set of the integers in range(size), one bit each. Useful as the
+      visited set of a search whose states are numbered densely, such as
+      ranked or packed boards.
+    """
+    def __init__(self, size):
+        self.bits = bytearray((size + 7) // 8)
+        self.count = 0
+
+    def add(self, index):
+        "Adds index to the set; returns True if it was not already in it"
+        byte, bit = index >> 3, 1 << (index & 7)
+        if self.bits[byte] & bit:
+            return False
+        self.bits[byte] |= bit
+        self.count += 1
+        return True
+
+    def __contains__(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def __len__(self):
+        return self.count
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
@@ -176,6 +208,9 @@ class PriorityQueue:
     def isEmpty(self):
         return len(self.heap) == 0
 
+    def __len__(self):
+        return len(self.heap)
+
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
@@ -191,6 +226,159 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue:
+    """
+      A priority queue with the same push/pop/update/isEmpty interface as
+      PriorityQueue, implemented as a binary heap that also maps every
+      queued item's key to its position in the heap. update() can then
+      find an item and lower its priority in O(log n) instead of scanning
+      and re-heapifying the whole queue.
+
+      key: function from an item to a hashable key identifying it (by
+      default the item itself). Only one item per key is queued at a time.
+      Ties are popped in insertion order, as in PriorityQueue.
+    """
+    def  __init__(self, key=None):
+        self.heap = []
+        self.position = {}
+        self.key = key or (lambda item: item)
+        self.count = 0
+
+    def push(self, item, priority):
+        "Adds item, replacing any queued item with the same key"
+        key = self.key(item)
+        if key in self.position:
+            index = self.position[key]
+            self.heap[index] = [priority, self.heap[index][1], item, key]
+            self._siftUp(index)
+            self._siftDown(self.position[key])
+            return
+        self.heap.append([priority, self.count, item, key])
+        self.count += 1
+        self.position[key] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.position[top[3]]
+        if heap:
+            heap[0] = last
+            self.position[last[3]] = 0
+            self._siftDown(0)
+        return top[2]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def update(self, item, priority):
+        # If an item with the same key is queued with higher priority, replace it and sift it up.
+        # If it is queued with equal or lower priority, do nothing.
+        # If no item with that key is queued, do the same thing as self.push.
+        key = self.key(item)
+        index = self.position.get(key)
+        if index is None:
+            self.push(item, priority)
+        elif priority < self.heap[index][0]:
+            entry = self.heap[index]
+            entry[0] = priority
+            entry[2] = item
+            self._siftUp(index)
+
+    def _siftUp(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        priority, count = entry[0], entry[1]
+        while index > 0:
+            parent = (index - 1) >> 1
+            above = heap[parent]
+            if above[0] < priority or (above[0] == priority and above[1] < count):
+                break
+            heap[index] = above
+            position[above[3]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[3]] = index
+
+    def _siftDown(self, index):
+        # Like heapq: move the smaller child up until a leaf is reached, then
+        # sift the entry back up from there, which needs fewer comparisons
+        # than stopping as soon as the entry is in order.
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        child = 2 * index + 1
+        while child < size:
+            right = child + 1
+            if right < size:
+                left, other = heap[child], heap[right]
+                if other[0] < left[0] or (other[0] == left[0] and other[1] < left[1]):
+                    child = right
+            heap[index] = heap[child]
+            position[heap[index][3]] = index
+            index = child
+            child = 2 * index + 1
+        heap[index] = entry
+        self._siftUp(index)
+
+class BucketPriorityQueue:
+    """
+      A priority queue for small non-negative integer priorities, such as
+      f = g + h in A* with unit move costs and an integer heuristic. Items
+      are kept in one bucket per priority, so push and pop are O(1)
+      (amortized over the scan for the next non-empty bucket).
+
+      Within a bucket, items of greater depth are popped first, and among
+      equal depths the most recently pushed: for A* this prefers the nodes
+      closest to the goal among those of equal f.
+
+      depth: function from an item to its integer depth (for A*, its path
+      cost g). By default every item has depth 0.
+    """
+    def  __init__(self, depth=None):
+        # buckets[priority][depth] is a stack of items; a bucket's last
+        # stack is never left empty, so bucket[-1] is its deepest.
+        self.buckets = []
+        self.depth = depth or (lambda item: 0)
+        self.minPriority = 0
+        self.size = 0
+
+    def push(self, item, priority):
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        bucket = buckets[priority]
+        depth = self.depth(item)
+        while len(bucket) <= depth:
+            bucket.append([])
+        bucket[depth].append(item)
+        if priority < self.minPriority:
+            self.minPriority = priority
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        priority = self.minPriority
+        while not buckets[priority]:
+            priority += 1
+        self.minPriority = priority
+        bucket = buckets[priority]
+        item = bucket[-1].pop()
+        while bucket and not bucket[-1]:
+            bucket.pop()
+        self.size -= 1
+        return item
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -617,8 +805,8 @@ class TimeoutFunction:
             try:
                 result = self.function(*args, **keyArgs)
             finally:
+                signal.alarm(0)
                 signal.signal(signal.SIGALRM, old)
-            signal.alarm(0)
         else:
             startTime = time.time()
             result = self.function(*args, **keyArgs)
@@ -0,0 +1,143 @@
+# vectorized.py
+"""
+NumPy versions of the heuristics and of successor generation, working on
+many boards at once.
+
+A batch of boards is an (N, 16) uint8 array, one board per row in the same
+row-major order as FifteenPuzzleState's numbers (0 is the blank). Each
+heuristic is a table indexed by (tile, position), so scoring a batch is a
+single gather and a row sum. successors() expands a whole frontier layer
+into the array of its children, and packBoards() turns boards into the
+same 64-bit keys as fifteenpuzzle.packCells, which np.unique can dedup.
+randomSolvableBoards() draws uniformly random solvable boards.
+
+This module needs NumPy; the rest of the project does not.
+"""
+
+import numpy as np
+
+GOAL = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0], dtype=np.uint8)
+
+MOVES = ('up', 'down', 'left', 'right')
+MOVE_OFFSETS = np.array([-4, 4, -1, 1])
+# index in MOVES of the move that undoes each move
+OPPOSITE_MOVE_INDEX = np.array([1, 0, 3, 2])
+
+_POSITIONS = np.arange(16)
+_ROWS, _COLS = np.divmod(_POSITIONS, 4)
+# goal row and column of each tile; the blank's are irrelevant
+_GOAL_ROWS, _GOAL_COLS = np.divmod(np.arange(16) - 1, 4)
+
+# LEGAL[move, position]: the blank on position can make move
+LEGAL = np.array([_ROWS != 0, _ROWS != 3, _COLS != 0, _COLS != 3])
+
+def _tileTable(function):
+    "Builds a (tile, position) table from function(tile, position), zero for the blank."
+    table = function(np.arange(16)[:, None], _POSITIONS[None, :])
+    table[0, :] = 0
+    return table
+
+_rowDistance = lambda tile, position: np.abs(_ROWS[position] - _GOAL_ROWS[tile])
+_colDistance = lambda tile, position: np.abs(_COLS[position] - _GOAL_COLS[tile])
+
+# Same values as heuristics.h1: cells not holding their goal number (blank included)
+H1_TABLE = (np.arange(16)[:, None] != GOAL[None, :]).astype(np.int32)
+# heuristics.h2: Euclidean distance of every tile to its goal cell
+H2_TABLE = _tileTable(lambda t, p: np.sqrt(_rowDistance(t, p) ** 2.0 + _colDistance(t, p) ** 2.0))
+# heuristics.h3: Manhattan distance
+H3_TABLE = _tileTable(lambda t, p: (_rowDistance(t, p) + _colDistance(t, p)).astype(np.int32))
+# heuristics.h4: tiles out of their goal row plus tiles out of their goal column
+H4_TABLE = _tileTable(lambda t, p: ((_rowDistance(t, p) != 0).astype(np.int32) +
+                                    (_colDistance(t, p) != 0).astype(np.int32)))
+
+def boardsArray(puzzles):
+    """
+    Converts a sequence of puzzle states or lists of 16 numbers into an
+    (N, 16) uint8 array.
+    """
+    return np.array([getattr(puzzle, 'tiles', puzzle) for puzzle in puzzles],
+                    dtype=np.uint8).reshape(-1, 16)
+
+def evaluate(table, boards):
+    "Sums table[tile, position] over every cell of every board."
+    return table[boards, _POSITIONS].sum(axis=1)
+
+def h1Batch(boards):
+    return evaluate(H1_TABLE, boards)
+
+def h2Batch(boards):
+    return evaluate(H2_TABLE, boards)
+
+def h3Batch(boards):
+    return evaluate(H3_TABLE, boards)
+
+def h4Batch(boards):
+    return evaluate(H4_TABLE, boards)
+
+def blankPositions(boards):
+    "The index of the blank in every board."
+    return np.argmin(boards, axis=1)
+
+def successors(boards, lastMoves=None):
+    """
+    Expands every board of the (N, 16) array boards at once.
+
+    lastMoves: optional length N array with, for each board, the index in
+    MOVES of the move that produced it (or -1); the move undoing it is not
+    generated.
+
+    Returns (children, parents, moves): the (M, 16) array of child boards,
+    the row of boards each child came from and the index in MOVES of the
+    move that produced it.
+    """
+    blank = blankPositions(boards)
+    children, parents, moves = [], [], []
+    for move in range(4):
+        allowed = LEGAL[move][blank]
+        if lastMoves is not None:
+            allowed &= lastMoves != OPPOSITE_MOVE_INDEX[move]
+        rows = np.nonzero(allowed)[0]
+        child = boards[rows]
+        source = blank[rows]
+        target = source + MOVE_OFFSETS[move]
+        index = np.arange(len(rows))
+        child[index, source] = child[index, target]
+        child[index, target] = 0
+        children.append(child)
+        parents.append(rows)
+        moves.append(np.full(len(rows), move, dtype=np.int8))
+    return np.concatenate(children), np.concatenate(parents), np.concatenate(moves)
+
+# every pair of positions (i, j) with i < j
+_PAIRS_I, _PAIRS_J = np.triu_indices(16, 1)
+
+def randomSolvableBoards(count, rng):
+    """
+    count uniformly random solvable boards as a (count, 16) array, drawn
+    from the NumPy Generator rng like generator.randomSolvableNumbers: each
+    row is shuffled, and the first two tiles are swapped in the unsolvable
+    ones. The parity test of fifteenpuzzle.isSolvableBoard is done with
+    inversions, numbering the blank 16 so that it sorts to its goal cell.
+    """
+    boards = rng.permuted(np.broadcast_to(GOAL, (count, 16)), axis=1)
+    ordered = np.where(boards == 0, 16, boards)
+    inversions = np.count_nonzero(ordered[:, _PAIRS_I] > ordered[:, _PAIRS_J], axis=1)
+    blank = blankPositions(boards)
+    distance = 6 - _ROWS[blank] - _COLS[blank]
+    rows = np.nonzero((inversions - distance) % 2)[0]
+    # the first two cells that do not hold the blank
+    first = np.where(blank[rows] == 0, 1, 0)
+    second = np.where(blank[rows] <= 1, 2, 1)
+    boards[rows, first], boards[rows, second] = boards[rows, second], boards[rows, first]
+    return boards
+
+_SHIFTS = (4 * _POSITIONS).astype(np.uint64)
+
+def packBoards(boards):
+    "The packed 64-bit key of every board, as computed by fifteenpuzzle.packCells."
+    return np.bitwise_or.reduce(boards.astype(np.uint64) << _SHIFTS, axis=1)
+
+def unpackBoards(keys):
+    "Inverse of packBoards."
+    keys = np.asarray(keys, dtype=np.uint64)
+    return ((keys[:, None] >> _SHIFTS) & np.uint64(15)).astype(np.uint8)